@@ -0,0 +1,120 @@
+"""Retrieval quality and latency benchmark for chatpdf.
+
+Compares the old retrieval (10,000-character chunks, top 4 by vector search)
+with BM25 alone and hybrid BM25 + vector retrieval on smaller chunks under a
+token budget.
+Quality is the share of questions whose answer text ends up in the context
+sent to the LLM. Run from backend/flask:
+    python -m package.chatpdf.bench_retrieval
+    python -m package.chatpdf.bench_retrieval --pdf book.pdf --questions questions.json --embeddings local
+The questions file is a JSON list of {"question": ..., "answer": ...}.
+"""
+import argparse
+import json
+import tempfile
+import time
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from PyPDF2 import PdfReader
+from .embeddings import make_embedder
+from .index_cache import FUSION_CANDIDATES, IndexCache, fit_to_budget
+
+FILLER_WORDS = 2000
+# Question words also appear in the filler, so only the entity name singles a fact out
+COMMON_WORDS = ["the", "is", "for", "what", "access", "code", "archive"] * 20
+
+
+def synthetic_document(n_sections, seed):
+    """Filler text with one planted fact per section, and a question per fact."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    words = ["".join(rng.choice(letters, size=rng.integers(3, 9))) for _ in range(FILLER_WORDS)] + COMMON_WORDS
+    sections, questions = [], []
+    for section in range(n_sections):
+        entity = "".join(rng.choice(letters, size=8))
+        answer = f"{rng.integers(10 ** 5, 10 ** 6)}"
+        filler = [" ".join(rng.choice(words, size=12)) + "." for _ in range(60)]
+        filler.insert(int(rng.integers(len(filler))), f"The access code for the {entity} archive is {answer}.")
+        sections.append(f"Section {section}\n\n" + "\n".join(filler))
+        questions.append({"question": f"What is the access code for the {entity} archive?", "answer": answer})
+    return "\n\n".join(sections), questions
+
+
+def pdf_text(paths):
+    return "".join(page.extract_text() or "" for path in paths for page in PdfReader(path).pages)
+
+
+def evaluate(name, text, questions, embedder, chunk_size, chunk_overlap, retrieve):
+    chunks = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+    start = time.perf_counter()
+    index = IndexCache(tempfile.mkdtemp(prefix="bench-retrieval-")).put(
+        "0" * 32, chunks, embedder.embed_documents(chunks))
+    build_seconds = time.perf_counter() - start
+
+    queries = [embedder.embed_query(item["question"]) for item in questions]
+    found, context_chars, latencies = 0, [], []
+    for item, query in zip(questions, queries):
+        start = time.perf_counter()
+        context = retrieve(index, query, item["question"])
+        latencies.append(time.perf_counter() - start)
+        context_chars.append(sum(len(chunk) for chunk in context))
+        found += any(item["answer"] in chunk for chunk in context)
+    return {
+        "retriever": name,
+        "chunk_size": chunk_size,
+        "chunks": len(chunks),
+        "build_seconds": round(build_seconds, 3),
+        "recall": round(found / len(questions), 3),
+        "mean_context_chars": round(float(np.mean(context_chars))),
+        "p50_retrieval_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_retrieval_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", nargs="+", help="PDFs to index (default: a synthetic document)")
+    parser.add_argument("--questions", help="JSON list of {question, answer} for --pdf")
+    parser.add_argument("--sections", type=int, default=200, help="sections in the synthetic document")
+    parser.add_argument("--embeddings", default="hashing", help="google, local or hashing")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[500, 1000, 1500])
+    parser.add_argument("--context-tokens", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if args.pdf:
+        if not args.questions:
+            parser.error("--pdf needs --questions")
+        text = pdf_text(args.pdf)
+        with open(args.questions) as f:
+            questions = json.load(f)
+    else:
+        text, questions = synthetic_document(args.sections, args.seed)
+    embedder = make_embedder(args.embeddings, cache_path=None)
+
+    runs = [("vector top-4 (old)", 10000, 1000, lambda index, query, question: index.search(query, k=4))]
+    for chunk_size in args.chunk_size:
+        runs.append(("bm25", chunk_size, chunk_size // 10,
+                     lambda index, query, question: fit_to_budget(
+                         [index.chunks[i] for i in index.lexical.top(question, FUSION_CANDIDATES).tolist()],
+                         args.context_tokens)))
+        runs.append(("hybrid", chunk_size, chunk_size // 10,
+                     lambda index, query, question: index.hybrid_search(query, question, args.context_tokens)))
+
+    results = []
+    print(f"{len(text):,} characters, {len(questions)} questions, {embedder.name} embeddings")
+    print(f"{'retriever':<20} {'chunk':>6} {'chunks':>6} {'recall':>6} {'context chars':>13} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, chunk_size, chunk_overlap, retrieve in runs:
+        row = evaluate(name, text, questions, embedder, chunk_size, chunk_overlap, retrieve)
+        results.append(row)
+        print(f"{row['retriever']:<20} {row['chunk_size']:>6} {row['chunks']:>6} {row['recall']:>6} "
+              f"{row['mean_context_chars']:>13} {row['p50_retrieval_ms']:>8} {row['p95_retrieval_ms']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json
+import os
+import re
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over text chunks, as a sparse chunk x term frequency matrix.
+
+    Scoring a query only touches the columns of its terms, so it costs
+    the number of chunks containing them rather than the corpus size.
+    """
+
+    def __init__(self, frequencies, vocabulary, k1=1.5, b=0.75):
+        self.frequencies = frequencies.tocsc()
+        self.vocabulary = vocabulary
+        self.k1 = k1
+        self.b = b
+        lengths = np.asarray(frequencies.sum(axis=1)).ravel()
+        self.length_norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0)) if len(lengths) else lengths
+        n_chunks = frequencies.shape[0]
+        containing = np.diff(self.frequencies.indptr)
+        self.idf = np.log1p((n_chunks - containing + 0.5) / (containing + 0.5))
+
+    @classmethod
+    def build(cls, chunks):
+        vocabulary, rows, cols = {}, [], []
+        for row, chunk in enumerate(chunks):
+            for token in tokenize(chunk):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        # Duplicate (row, col) entries are summed into term counts
+        frequencies = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                        shape=(len(chunks), len(vocabulary)))
+        frequencies.sum_duplicates()
+        return cls(frequencies, vocabulary)
+
+    def scores(self, query):
+        """BM25 score of every chunk for a query string."""
+        scores = np.zeros(self.frequencies.shape[0], dtype=np.float64)
+        for term in set(tokenize(query)):
+            column = self.vocabulary.get(term)
+            if column is None:
+                continue
+            start, end = self.frequencies.indptr[column], self.frequencies.indptr[column + 1]
+            rows = self.frequencies.indices[start:end]
+            tf = self.frequencies.data[start:end]
+            scores[rows] += self.idf[column] * tf * (self.k1 + 1) / (tf + self.length_norm[rows])
+        return scores
+
+    def top(self, query, k, with_scores=False):
+        """Ids of the k best-scoring chunks that contain a query term, best first.
+
+        With `with_scores`, returns (ids, scores).
+        """
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return (matched, scores[matched]) if with_scores else matched
+
+    def save(self, directory):
+        sparse.save_npz(os.path.join(directory, "terms.npz"), self.frequencies.tocsr())
+        with open(os.path.join(directory, "vocabulary.json"), "w") as f:
+            json.dump(self.vocabulary, f)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "vocabulary.json")) as f:
+            vocabulary = json.load(f)
+        return cls(sparse.load_npz(os.path.join(directory, "terms.npz")), vocabulary)
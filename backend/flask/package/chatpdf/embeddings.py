@@ -0,0 +1,175 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+EMBEDDING_BACKEND = os.getenv("CHATPDF_EMBEDDINGS", "google")  # google, local or hashing
+EMBEDDING_CACHE_PATH = os.getenv("CHATPDF_EMBEDDING_CACHE", "embedding_cache.sqlite3")
+LOCAL_MODEL = "all-MiniLM-L6-v2"  # Same model the mentor matching uses
+HASHING_DIM = 512
+SQLITE_BATCH = 500  # Stays under SQLite's bound-parameter limit
+QUERY_CACHE_SIZE = 1024  # Question embeddings kept in memory; they never go to SQLite
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class GoogleEmbedder:
+    """Gemini embeddings through LangChain, the default backend."""
+
+    def __init__(self, model="models/embedding-001"):
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        self.name = f"google:{model}"
+        self.client = GoogleGenerativeAIEmbeddings(model=model)
+
+    def embed_documents(self, texts):
+        return np.asarray(self.client.embed_documents(texts), dtype=np.float32)
+
+    def embed_query(self, text):
+        return np.asarray(self.client.embed_query(text), dtype=np.float32)
+
+
+class LocalEmbedder:
+    """Sentence-transformers model on the local CPU; no network calls."""
+
+    def __init__(self, model=LOCAL_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.name = f"local:{model}"
+        self.model = SentenceTransformer(model)
+
+    def embed_documents(self, texts):
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words vectors from hashed tokens.
+
+    No model and no network, so ingestion and retrieval can be tested and
+    benchmarked offline; similar texts still land close together.
+    """
+
+    def __init__(self, dim=HASHING_DIM):
+        self.name = f"hashing:{dim}"
+        self.dim = dim
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        return np.array([self._vector(text) for text in texts], dtype=np.float32).reshape(len(texts), self.dim)
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+BACKENDS = {"google": GoogleEmbedder, "local": LocalEmbedder, "hashing": HashingEmbedder}
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbedder:
+    """Wraps an embedder with a text-hash -> vector cache in SQLite.
+
+    Vectors are keyed by the backend name and the SHA-256 of the text, so
+    chunks seen in any earlier upload are never sent to the backend again.
+    Question embeddings go to a bounded in-memory LRU instead: every
+    distinct question would otherwise grow the database forever.
+    """
+
+    def __init__(self, embedder, path=EMBEDDING_CACHE_PATH, query_cache_size=QUERY_CACHE_SIZE):
+        self.embedder = embedder
+        self.name = embedder.name
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.queries = OrderedDict()
+        self.query_cache_size = query_cache_size
+        self.hits = 0
+        self.misses = 0
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS embeddings ("
+                               "model TEXT, hash TEXT, vector BLOB, PRIMARY KEY (model, hash))")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared across threads
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def _lookup(self, model, hashes):
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(hashes), SQLITE_BATCH):
+            batch = hashes[start:start + SQLITE_BATCH]
+            rows = connection.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                [model, *batch])
+            found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def _store(self, model, vectors):
+        with self._connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                                   [(model, key, vector.tobytes()) for key, vector in vectors.items()])
+
+    def _count(self, hits, misses):
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def embed_documents(self, texts):
+        hashes = [text_hash(text) for text in texts]
+        found = self._lookup(self.name, list(set(hashes)))
+        # Each distinct missing text is embedded once, even if repeated in the batch
+        missing = {key: text for key, text in zip(hashes, texts) if key not in found}
+        if missing:
+            fresh = dict(zip(missing, np.asarray(self.embedder.embed_documents(list(missing.values())),
+                                                 dtype=np.float32)))
+            self._store(self.name, fresh)
+            found.update(fresh)
+        self._count(len(texts) - len(missing), len(missing))
+        return np.array([found[key] for key in hashes], dtype=np.float32)
+
+    def embed_query(self, text):
+        key = text_hash(text)
+        with self.lock:
+            vector = self.queries.get(key)
+            if vector is not None:
+                self.queries.move_to_end(key)
+                self.hits += 1
+                return vector
+        vector = np.asarray(self.embedder.embed_query(text), dtype=np.float32)
+        with self.lock:
+            self.queries[key] = vector
+            while len(self.queries) > self.query_cache_size:
+                self.queries.popitem(last=False)
+            self.misses += 1
+        return vector
+
+    def stats(self):
+        with self.lock:
+            return {"backend": self.name, "hits": self.hits, "misses": self.misses,
+                    "cached_queries": len(self.queries)}
+
+
+def make_embedder(backend=EMBEDDING_BACKEND, cache_path=EMBEDDING_CACHE_PATH):
+    """Embedder for a CHATPDF_EMBEDDINGS backend name, cached on disk unless cache_path is None."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embeddings backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    embedder = BACKENDS[backend]()
+    return CachedEmbedder(embedder, cache_path) if cache_path else embedder
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+import faiss
+import numpy as np
+from .bm25 import BM25Index
+
+INDEX_DIR = "faiss_indexes"
+# Memory budget for indexes held in RAM; the rest are searched memory-mapped
+CACHE_BUDGET_BYTES = int(os.getenv("CHATPDF_INDEX_CACHE_MB", "512")) * 2 ** 20
+DOC_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+LEXICAL_WEIGHT = 0.6    # Share of the fused score from BM25; the rest is vector similarity
+FUSION_CANDIDATES = 20  # Chunks taken from each retriever before fusion
+MAX_COLD_INDEXES = 32   # Memory-mapped indexes kept open with their chunks and BM25
+CHARS_PER_TOKEN = 4     # Rough English average, used for the context budget
+
+
+def content_hash(digests, namespace=""):
+    """Document-set id from the uploaded files' SHA-256 digests, independent of upload order.
+
+    `namespace` (the embeddings backend) keeps indexes built with different
+    embedders apart.
+    """
+    return hashlib.sha256((namespace + "".join(sorted(digests))).encode("utf-8")).hexdigest()[:32]
+
+
+def fit_to_budget(chunks, max_tokens):
+    """Chunks, in order, that fit in `max_tokens`.
+
+    A chunk too long for what is left is skipped so shorter ones further down
+    can still fill the budget; the first chunk is cut to fit if needed.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    selected = []
+    for chunk in chunks:
+        if len(chunk) > budget:
+            if not selected:
+                selected.append(chunk[:budget])
+                budget = 0
+            continue
+        selected.append(chunk)
+        budget -= len(chunk)
+    return selected
+
+
+class DocumentIndex:
+    """Text chunks of one document set, their embeddings and a BM25 index.
+
+    Vectors are stored as a .npy file. A hot index holds them only in a
+    FAISS IndexFlatL2, which keeps its own copy, so `vectors` is None; a
+    cold one searches a memory-mapped view of the file, so only the pages
+    it touches are read. Without `lexical`, the BM25 index is loaded from
+    `path` (or rebuilt) on the first hybrid search.
+    """
+
+    def __init__(self, doc_id, chunks, vectors, lexical=None, hot=True, path=None):
+        self.doc_id = doc_id
+        self.chunks = chunks
+        self.vectors = vectors
+        self.path = path
+        self._lexical = lexical
+        self._lexical_lock = threading.Lock()
+        self.faiss_index = None
+        if hot:
+            self.faiss_index = faiss.IndexFlatL2(vectors.shape[1])
+            self.faiss_index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+            self.vectors = None
+
+    @property
+    def lexical(self):
+        if self._lexical is None:
+            with self._lexical_lock:
+                if self._lexical is None:
+                    if self.path and os.path.exists(os.path.join(self.path, "terms.npz")):
+                        self._lexical = BM25Index.load(self.path)
+                    else:
+                        self._lexical = BM25Index.build(self.chunks)  # Index saved before BM25 was added
+        return self._lexical
+
+    @property
+    def resident_bytes(self):
+        """Float vectors held in RAM by FAISS, the part counted against the cache budget."""
+        if self.faiss_index is None:
+            return 0
+        return self.faiss_index.ntotal * self.faiss_index.d * np.dtype(np.float32).itemsize
+
+    def with_vectors(self, vectors, hot):
+        """The same chunks and BM25 index over other vectors, hot or cold."""
+        return DocumentIndex(self.doc_id, self.chunks, vectors, self._lexical, hot=hot, path=self.path)
+
+    def nearest(self, query, k):
+        """Ids of the k chunks nearest to a query embedding and their squared distances, closest first."""
+        query = np.asarray(query, dtype=np.float32).reshape(1, -1)
+        k = min(k, len(self.chunks))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if self.faiss_index is not None:
+            distances, ids = self.faiss_index.search(query, k)
+            found = ids[0] >= 0
+            return ids[0][found], distances[0][found]
+        distances = ((self.vectors - query) ** 2).sum(axis=1)
+        ids = np.argpartition(distances, k - 1)[:k]
+        ids = ids[np.argsort(distances[ids], kind="stable")]
+        return ids, distances[ids]
+
+    def search(self, query, k=4):
+        """The k chunks nearest to a query embedding, closest first."""
+        return [self.chunks[i] for i in self.nearest(query, k)[0].tolist()]
+
+    def hybrid_search(self, query, question, max_tokens, candidates=FUSION_CANDIDATES):
+        """Chunks ranked by a weighted fusion of BM25 and vector scores.
+
+        Each retriever contributes its top `candidates`, with scores scaled
+        to 0..1 within that list (0 for a chunk it did not return). A chunk
+        scores LEXICAL_WEIGHT * bm25 + (1 - LEXICAL_WEIGHT) * vector. The
+        best BM25 hit always comes first: an exact term match is the
+        strongest evidence, and chunks found mid-list by both retrievers
+        must not push it out of the context. Chunks scoring 0 (the farthest
+        vector candidate, unless BM25 also found it) are dropped; the rest
+        are taken in order until `max_tokens` of context is filled.
+        """
+        vector_ids, distances = self.nearest(query, candidates)
+        lexical_ids, lexical_scores = self.lexical.top(question, candidates, with_scores=True)
+        fused = {}
+        if len(vector_ids):
+            spread = float(distances[-1] - distances[0])
+            for chunk, distance in zip(vector_ids.tolist(), distances.tolist()):
+                # Equally near candidates (or a single one) all get the full vector score
+                fused[chunk] = (1 - LEXICAL_WEIGHT) * ((distances[-1] - distance) / spread if spread else 1.0)
+        if len(lexical_ids):
+            for chunk, score in zip(lexical_ids.tolist(), (lexical_scores / lexical_scores[0]).tolist()):
+                fused[chunk] = fused.get(chunk, 0.0) + LEXICAL_WEIGHT * score
+        ranked = sorted((chunk for chunk in fused if fused[chunk] > 0), key=lambda chunk: (-fused[chunk], chunk))
+        if len(lexical_ids):
+            ranked.remove(int(lexical_ids[0]))
+            ranked.insert(0, int(lexical_ids[0]))
+        return fit_to_budget([self.chunks[i] for i in ranked], max_tokens)
+
+
+class IndexCache:
+    """LRU of document indexes keyed by content hash.
+
+    Every index is written to `directory` when it is created. Hot indexes
+    hold their vectors in RAM, bounded by `budget_bytes`; past it the least
+    recently asked are demoted to cold handles that search memory-mapped
+    vectors but keep their chunks and BM25 index, so questions on them do
+    not re-read the files. An index larger than the whole budget is only
+    ever cold. At most `max_cold` cold handles are kept.
+    """
+
+    def __init__(self, directory=INDEX_DIR, budget_bytes=CACHE_BUDGET_BYTES, max_cold=MAX_COLD_INDEXES):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.max_cold = max_cold
+        self.lock = threading.Lock()
+        self.indexes = OrderedDict()
+        self.hot_bytes = 0
+
+    def _path(self, doc_id):
+        return os.path.join(self.directory, doc_id)
+
+    def _mapped_vectors(self, doc_id):
+        return np.load(os.path.join(self._path(doc_id), "vectors.npy"), mmap_mode="r")
+
+    def exists(self, doc_id):
+        if not DOC_ID_PATTERN.fullmatch(doc_id):
+            return False
+        with self.lock:
+            if doc_id in self.indexes:
+                return True
+        return os.path.exists(os.path.join(self._path(doc_id), "vectors.npy"))
+
+    def put(self, doc_id, chunks, vectors):
+        """Persist a freshly built index and keep it in memory."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        tmp = self._path(f".{doc_id}.{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "vectors.npy"), vectors)
+        with open(os.path.join(tmp, "chunks.json"), "w") as f:
+            json.dump(chunks, f)
+        lexical = BM25Index.build(chunks)
+        lexical.save(tmp)
+        try:
+            os.replace(tmp, self._path(doc_id))
+        except OSError:
+            # Same content uploaded concurrently; the first copy wins
+            shutil.rmtree(tmp, ignore_errors=True)
+        hot = vectors.nbytes <= self.budget_bytes
+        index = DocumentIndex(doc_id, chunks, vectors if hot else self._mapped_vectors(doc_id), lexical,
+                              hot=hot, path=self._path(doc_id))
+        return self._remember(index)
+
+    def get(self, doc_id):
+        """Index for a document set, or None if it was never processed."""
+        if not DOC_ID_PATTERN.fullmatch(doc_id):
+            return None
+        with self.lock:
+            index = self.indexes.get(doc_id)
+            if index is not None:
+                self.indexes.move_to_end(doc_id)
+        if index is not None and (index.faiss_index is not None or index.vectors.nbytes > self.budget_bytes):
+            return index
+
+        if index is not None:
+            # Demoted earlier and small enough to be hot again: reuse its chunks and BM25
+            return self._remember(index.with_vectors(np.asarray(index.vectors, dtype=np.float32), hot=True))
+        path = self._path(doc_id)
+        if not os.path.exists(os.path.join(path, "vectors.npy")):
+            return None
+        vectors = self._mapped_vectors(doc_id)
+        with open(os.path.join(path, "chunks.json")) as f:
+            chunks = json.load(f)
+        index = DocumentIndex(doc_id, chunks, vectors, hot=vectors.nbytes <= self.budget_bytes, path=path)
+        return self._remember(index)
+
+    def _remember(self, index):
+        # Requests already holding an index keep using it whatever happens here
+        with self.lock:
+            previous = self.indexes.pop(index.doc_id, None)
+            if previous is not None:
+                self.hot_bytes -= previous.resident_bytes
+            self.indexes[index.doc_id] = index
+            self.hot_bytes += index.resident_bytes
+            # Least recently asked first: demote hot indexes to memory-mapped handles
+            for doc_id, other in list(self.indexes.items()):
+                if self.hot_bytes <= self.budget_bytes:
+                    break
+                if other.faiss_index is not None and other is not index:
+                    self.hot_bytes -= other.resident_bytes
+                    self.indexes[doc_id] = other.with_vectors(self._mapped_vectors(doc_id), hot=False)
+            cold_ids = [doc_id for doc_id, other in self.indexes.items() if other.faiss_index is None]
+            for doc_id in cold_ids[:max(0, len(cold_ids) - self.max_cold)]:
+                del self.indexes[doc_id]
+        return index
+
+    def stats(self):
+        with self.lock:
+            hot = sum(1 for index in self.indexes.values() if index.faiss_index is not None)
+            return {"hot_indexes": hot, "cold_indexes": len(self.indexes) - hot, "hot_bytes": self.hot_bytes,
+                    "budget_bytes": self.budget_bytes}
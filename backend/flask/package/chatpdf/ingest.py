@@ -0,0 +1,218 @@
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from PyPDF2 import PdfReader
+from PyPDF2.errors import PdfReadError
+
+INGEST_WORKERS = int(os.getenv("CHATPDF_INGEST_WORKERS", "0")) or os.cpu_count() or 1
+PAGES_PER_TASK = 8          # Pages extracted per process-pool task
+MAX_PENDING_TASKS = 2 * INGEST_WORKERS  # Extraction tasks in flight; bounds buffered page text
+EMBED_BATCH_SIZE = 64       # Chunks sent to the embedder at once
+SPLIT_WINDOW_CHUNKS = 4     # Buffered text, in chunk sizes, before the splitter runs
+UPLOAD_BLOCK_BYTES = 2 ** 20
+JOB_TTL_SECONDS = 3600
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def page_pool():
+    """Process pool for page extraction, started on first use.
+
+    The first upload starts it from a request thread; a plain fork there
+    could hand the workers a lock held by another thread, so they come from
+    a forkserver (spawn where unavailable).
+    """
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _page_pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS,
+                                             mp_context=multiprocessing.get_context(method))
+        return _page_pool
+
+
+def save_upload(upload, directory):
+    """Stream an uploaded file to disk, returning its path and SHA-256."""
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        for block in iter(lambda: upload.stream.read(UPLOAD_BLOCK_BYTES), b""):
+            digest.update(block)
+            f.write(block)
+    return path, digest.hexdigest()
+
+
+def _extract_pages(path, start, stop):
+    # Runs in a worker process; the PDF is re-opened there instead of pickled
+    reader = PdfReader(path)
+    return [reader.pages[page].extract_text() or "" for page in range(start, stop)]
+
+
+def iter_pages(paths, pool, page_counts):
+    """Page texts of every PDF in order, with a bounded number of tasks in flight."""
+    tasks = ((path, start, min(start + PAGES_PER_TASK, count))
+             for path, count in zip(paths, page_counts)
+             for start in range(0, count, PAGES_PER_TASK))
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(_extract_pages, *task))
+        if len(pending) >= MAX_PENDING_TASKS:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+class StreamingSplitter:
+    """Feeds text to a LangChain splitter a window at a time.
+
+    Whenever the buffer holds a few chunks' worth of text it is split, every
+    chunk but the last is emitted, and the last one stays as the start of the
+    next window. Chunks therefore never cross more text than the window and
+    the whole document is never held at once.
+    """
+
+    def __init__(self, splitter, chunk_size):
+        self.splitter = splitter
+        self.window = SPLIT_WINDOW_CHUNKS * chunk_size
+        self.parts = []
+        self.size = 0
+
+    def feed(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size < self.window:
+            return []
+        chunks = self.splitter.split_text("".join(self.parts))
+        self.parts = chunks[-1:]
+        self.size = sum(len(part) for part in self.parts)
+        return chunks[:-1]
+
+    def finish(self):
+        text = "".join(self.parts)
+        self.parts, self.size = [], 0
+        return self.splitter.split_text(text) if text.strip() else []
+
+
+class IngestJob:
+    """Progress of one PDF upload being extracted, split and embedded."""
+
+    def __init__(self, doc_id):
+        self.id = uuid.uuid4().hex
+        self.doc_id = doc_id
+        self.status = "queued"
+        self.pages_total = 0
+        self.pages_done = 0
+        self.chunks = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.bad_input = False  # Failed on the uploaded files rather than on our side
+        self.lock = threading.Lock()
+
+    def update(self, **fields):
+        with self.lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self):
+        elapsed = self.elapsed()
+        return {
+            "job_id": self.id,
+            "doc_id": self.doc_id,
+            "status": self.status,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.pages_done / elapsed, 1) if elapsed else None,
+            "error": self.error,
+        }
+
+
+def ingest(job, paths, splitter, chunk_size, embed, pool):
+    """Extract, split and embed PDFs as a pipeline; returns (chunks, vectors).
+
+    Pages stream from the process pool into the splitter and finished chunks
+    are embedded EMBED_BATCH_SIZE at a time, so the working set is a few
+    extraction tasks, one split window and one embedding batch.
+    """
+    try:
+        page_counts = [len(PdfReader(path).pages) for path in paths]
+    except PdfReadError as e:
+        raise ValueError(f"Could not read PDF: {e}")
+    job.pages_total = sum(page_counts)
+    stream = StreamingSplitter(splitter, chunk_size)
+    chunks, vectors, batch = [], [], []
+
+    def flush():
+        if batch:
+            vectors.append(np.asarray(embed(batch), dtype=np.float32))
+            chunks.extend(batch)
+            batch.clear()
+            job.chunks = len(chunks)
+
+    for text in iter_pages(paths, pool, page_counts):
+        job.pages_done += 1
+        for chunk in stream.feed(text):
+            batch.append(chunk)
+            if len(batch) >= EMBED_BATCH_SIZE:
+                flush()
+    batch.extend(stream.finish())
+    flush()
+    return chunks, np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+class IngestManager:
+    """Runs ingestion jobs in background threads and keeps them for polling."""
+
+    def __init__(self, max_workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, doc_id, paths, upload_dir, run):
+        """Queue `run(job, paths)`; `upload_dir` holding the PDFs is removed afterwards."""
+        job = IngestJob(doc_id)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        return job, self.executor.submit(self._run, job, paths, upload_dir, run)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _prune(self):
+        now = time.time()
+        # finished_at is only set, together with the final status, once a job is done
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.finished_at is not None and now - job.finished_at > JOB_TTL_SECONDS]:
+            del self.jobs[job_id]
+
+    def _run(self, job, paths, upload_dir, run):
+        job.update(status="running", started_at=time.time())
+        try:
+            run(job, paths)
+            job.update(status="finished", finished_at=time.time())
+        except Exception as e:
+            job.update(status="failed", error=str(e), bad_input=isinstance(e, ValueError), finished_at=time.time())
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
@@ -0,0 +1,108 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+import numpy as np
+
+LLM_BACKEND = os.getenv("CHATPDF_LLM", "google")  # google or fake
+GEMINI_MODEL = "gemini-1.5-flash"
+FAKE_FIRST_TOKEN_SECONDS = float(os.getenv("CHATPDF_FAKE_LLM_FIRST_TOKEN_MS", "200")) / 1000
+FAKE_TOKEN_SECONDS = float(os.getenv("CHATPDF_FAKE_LLM_TOKEN_MS", "20")) / 1000
+LATENCY_SAMPLES = 1000  # Recent answers kept for the latency percentiles
+
+NOT_IN_CONTEXT = "answer is not available in the context"
+
+PROMPT_TEMPLATE = """
+Answer the question as detailed as possible from the provided context. If the answer is not in
+the provided context, say "answer is not available in the context" and do not provide a wrong answer.
+
+Context:
+{context}
+
+Question:
+{question}
+
+Answer:
+"""
+
+
+def build_prompt(chunks, question):
+    # Same layout the "stuff" QA chain produced: chunks joined by blank lines
+    return PROMPT_TEMPLATE.format(context="\n\n".join(chunks), question=question)
+
+
+class GeminiLLM:
+    """Gemini chat model through LangChain, streamed chunk by chunk."""
+
+    def __init__(self, model=GEMINI_MODEL):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        self.name = f"google:{model}"
+        self.model = ChatGoogleGenerativeAI(model=model, temperature=0.3)
+
+    def stream(self, prompt):
+        for chunk in self.model.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+class FakeLLM:
+    """Offline stand-in that streams the context's first sentence word by word.
+
+    Waits `first_token_seconds` before the first token and `token_seconds`
+    between the rest, so streaming and time-to-first-token can be tested and
+    measured without network access or credentials.
+    """
+
+    def __init__(self, first_token_seconds=FAKE_FIRST_TOKEN_SECONDS, token_seconds=FAKE_TOKEN_SECONDS):
+        self.name = "fake"
+        self.first_token_seconds = first_token_seconds
+        self.token_seconds = token_seconds
+
+    def stream(self, prompt):
+        context = prompt.split("Context:", 1)[-1].split("Question:", 1)[0].strip()
+        answer = re.split(r"(?<=[.!?])\s", context, maxsplit=1)[0] if context else NOT_IN_CONTEXT
+        time.sleep(self.first_token_seconds)
+        for i, word in enumerate(answer.split()):
+            if i:
+                time.sleep(self.token_seconds)
+            yield word if i == 0 else " " + word
+
+
+BACKENDS = {"google": GeminiLLM, "fake": FakeLLM}
+
+
+def make_llm(backend=LLM_BACKEND):
+    """LLM for a CHATPDF_LLM backend name."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend]()
+
+
+class LatencyStats:
+    """Time to first token and total generation time of recent answers."""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.lock = threading.Lock()
+        self.first_token = deque(maxlen=samples)
+        self.total = deque(maxlen=samples)
+        self.answers = 0
+
+    def record(self, first_token_seconds, total_seconds):
+        with self.lock:
+            if first_token_seconds is not None:
+                self.first_token.append(first_token_seconds)
+            self.total.append(total_seconds)
+            self.answers += 1
+
+    def _percentiles(self, values):
+        if not values:
+            return {"p50_ms": None, "p95_ms": None}
+        p50, p95 = np.percentile(values, [50, 95]) * 1000
+        return {"p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1)}
+
+    def to_dict(self):
+        with self.lock:
+            return {"answers": self.answers,
+                    "time_to_first_token": self._percentiles(list(self.first_token)),
+                    "total_time": self._percentiles(list(self.total))}
@@ -1,89 +1,165 @@
-from flask import Blueprint, request, jsonify
-from PyPDF2 import PdfReader
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+import json
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import shutil
+import tempfile
+import time
+from functools import lru_cache
 import google.generativeai as genai
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains.question_answering import load_qa_chain
-from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
+from .embeddings import make_embedder
+from .index_cache import IndexCache, content_hash
+from .ingest import IngestManager, ingest, page_pool, save_upload
+from .llm import NOT_IN_CONTEXT, LatencyStats, build_prompt, make_llm
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 chatpdf_bp = Blueprint('pdf_chat', __name__)
 
-def get_pdf_text(pdf_files):
-    text = ""
-    for pdf in pdf_files:
-        pdf_reader = PdfReader(pdf)
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-    return text
-
-def get_text_chunks(text):
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=10000, chunk_overlap=1000)
-    return text_splitter.split_text(text)
-
-def get_vector_store(text_chunks):
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
-    vector_store.save_local("faiss_index")
-
-def get_conversational_chain():
-    prompt_template = """
-    Answer the question as detailed as possible from the provided context. If the answer is not in
-    the provided context, say "answer is not available in the context" and do not provide a wrong answer.
-    
-    Context:
-    {context}
-    
-    Question:
-    {question}
-    
-    Answer:
-    """
-    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.3)
-    prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
-    return load_qa_chain(model, chain_type="stuff", prompt=prompt)
+# One index cache per process, shared by all requests
+index_cache = IndexCache()
+ingest_manager = IngestManager()
+answer_stats = LatencyStats()
+
+# Small chunks fused from vector and BM25 search keep the prompt to a fraction of
+# the old 4 x 10,000-character context
+CHUNK_SIZE = int(os.getenv("CHATPDF_CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("CHATPDF_CHUNK_OVERLAP", "50"))
+CONTEXT_TOKENS = int(os.getenv("CHATPDF_CONTEXT_TOKENS", "1500"))
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    # Built on first use, then shared by all requests; CHATPDF_EMBEDDINGS picks the backend
+    return make_embedder()
+
+def get_text_splitter():
+    return RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+def build_index(job, paths):
+    # Streaming pipeline: pages from the process pool, split and embedded in batches
+    chunks, vectors = ingest(job, paths, get_text_splitter(), CHUNK_SIZE, get_embeddings().embed_documents, page_pool())
+    if not chunks:
+        raise ValueError("No text extracted from PDFs")
+    index_cache.put(job.doc_id, chunks, vectors)
+
+@lru_cache(maxsize=None)
+def get_llm():
+    # Built once instead of per question; CHATPDF_LLM=fake answers offline
+    return make_llm()
+
+def timed_tokens(prompt, started):
+    """Stream the LLM's tokens, recording time to first token and total time since `started`."""
+    first_token = None
+    try:
+        for token in get_llm().stream(prompt):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            yield token
+    finally:
+        answer_stats.record(first_token, time.perf_counter() - started)
+
+def retrieve_context(data):
+    """(question, chunks, None) for an /ask request body, or (None, None, error response)."""
+    user_question = str(data.get("question", "")).strip()
+    if not user_question:
+        return None, None, (jsonify({"error": "No question provided"}), 400)
+    if not data.get("doc_id"):
+        return None, None, (jsonify({"error": "No doc_id provided, upload PDFs first"}), 400)
+
+    try:
+        index = index_cache.get(str(data["doc_id"]))
+    except Exception as e:
+        return None, None, (jsonify({"error": f"Failed to load vector store: {str(e)}"}), 500)
+    if index is None:
+        return None, None, (jsonify({"error": "Unknown doc_id, upload the PDFs again"}), 404)
+
+    # One query embedding, one in-memory vector search and one BM25 lookup per question
+    query = get_embeddings().embed_query(user_question)
+    return user_question, index.hybrid_search(query, user_question, CONTEXT_TOKENS), None
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @chatpdf_bp.route('/process_pdfs', methods=['POST'])
 def process_pdfs():
     if 'pdfs' not in request.files:
         return jsonify({"error": "No PDF files provided"}), 400
     
-    pdf_files = request.files.getlist('pdfs')
-    raw_text = get_pdf_text(pdf_files)
-    if not raw_text.strip():
-        return jsonify({"error": "No text extracted from PDFs"}), 400
-    
-    text_chunks = get_text_chunks(raw_text)
-    get_vector_store(text_chunks)
-    
-    return jsonify({"message": "PDFs processed successfully"})
+    # Uploads are streamed to disk and hashed on the way, never held in memory whole
+    upload_dir = tempfile.mkdtemp(prefix="chatpdf-")
+    saved = sorted((digest, path) for path, digest in
+                   (save_upload(pdf, upload_dir) for pdf in request.files.getlist('pdfs')))
+    # Indexes are keyed by content, so re-uploading the same PDFs is free
+    doc_id = content_hash([digest for digest, _ in saved], f"{get_embeddings().name}:{CHUNK_SIZE}:{CHUNK_OVERLAP}")
+    if index_cache.exists(doc_id):
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return jsonify({"message": "PDFs processed successfully", "doc_id": doc_id, "cached": True})
+
+    job, future = ingest_manager.submit(doc_id, [path for _, path in saved], upload_dir, build_index)
+    # wait=false returns at once; poll /process_pdfs/<job_id> for progress
+    if request.form.get("wait", "true").lower() == "false":
+        return jsonify(job.to_dict()), 202
+
+    future.result()
+    if job.status == "failed":
+        return jsonify({**job.to_dict(), "error": job.error}), 400 if job.bad_input else 500
+    return jsonify({"message": "PDFs processed successfully", "cached": False, **job.to_dict()})
+
+@chatpdf_bp.route('/process_pdfs/<job_id>', methods=['GET'])
+def ingest_progress(job_id):
+    job = ingest_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
 
 @chatpdf_bp.route('/ask', methods=['POST'])
 def ask_question():
-    data = request.json
-    user_question = data.get("question", "").strip()
-    
-    if not user_question:
-        return jsonify({"error": "No question provided"}), 400
-    
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    try:
-        new_db = FAISS.load_local("faiss_index", embeddings, allow_dangerous_deserialization=True)
-    except Exception as e:
-        return jsonify({"error": f"Failed to load vector store: {str(e)}"}), 500
-    
-    docs = new_db.similarity_search(user_question)
-    
-    if not docs:
-        return jsonify({"reply": "answer is not available in the context"})
-    
-    chain = get_conversational_chain()
-    response = chain({"input_documents": docs, "question": user_question}, return_only_outputs=True)
-    
-    return jsonify({"reply": response.get("output_text", "answer is not available in the context")})
+    started = time.perf_counter()
+    user_question, chunks, error = retrieve_context(request.get_json(silent=True) or {})
+    if error:
+        return error
+    if not chunks:
+        return jsonify({"reply": NOT_IN_CONTEXT})
+
+    reply = "".join(timed_tokens(build_prompt(chunks, user_question), started))
+    return jsonify({"reply": reply or NOT_IN_CONTEXT})
+
+@chatpdf_bp.route('/ask/stream', methods=['POST'])
+def ask_question_stream():
+    # Server-sent events: the retrieved sources first, then answer tokens as the model produces them
+    started = time.perf_counter()
+    user_question, chunks, error = retrieve_context(request.get_json(silent=True) or {})
+    if error:
+        return error
+
+    def events():
+        yield sse("sources", {"sources": [{"rank": rank, "text": chunk} for rank, chunk in enumerate(chunks)],
+                              "retrieval_ms": round((time.perf_counter() - started) * 1000, 1)})
+        first_token = None
+        try:
+            if not chunks:
+                first_token = time.perf_counter() - started
+                yield sse("token", {"text": NOT_IN_CONTEXT})
+            else:
+                for token in timed_tokens(build_prompt(chunks, user_question), started):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    yield sse("token", {"text": token})
+        except Exception as e:
+            yield sse("error", {"error": str(e)})
+            return
+        yield sse("done", {"time_to_first_token_ms": round(first_token * 1000, 1) if first_token is not None else None,
+                           "total_ms": round((time.perf_counter() - started) * 1000, 1)})
+
+    # No proxy buffering, or the tokens would still arrive all at once
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@chatpdf_bp.route('/stats', methods=['GET'])
+def cache_stats():
+    embedder = get_embeddings()
+    return jsonify({"embeddings": embedder.stats() if hasattr(embedder, "stats") else {"backend": embedder.name},
+                    "indexes": index_cache.stats(),
+                    "answers": answer_stats.to_dict()})
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from .judge0 import BATCH_SIZE
+
+CACHE_TTL_SECONDS = int(os.getenv("CODING_RESULT_CACHE_TTL", "600"))  # Below the poller's result TTL
+CACHE_MAX_ENTRIES = int(os.getenv("CODING_RESULT_CACHE_SIZE", "2048"))
+UNCACHEABLE_STATUSES = (13, 14)  # Internal Error, Exec Format Error: worth retrying
+
+
+def execution_key(source_code, language_id, stdin, expected_output=None):
+    """SHA-256 of everything that decides a Judge0 result."""
+    payload = json.dumps([source_code, language_id, stdin, expected_output])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Claim:
+    """A submission some request is sending right now; others wait for its token."""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.submission = None
+
+    def resolve(self, submission):
+        self.submission = submission
+        self.ready.set()
+
+    def wait(self, timeout):
+        if not self.ready.wait(timeout) or self.submission is None:
+            raise RuntimeError("Identical submission could not be sent to Judge0")
+        return self.submission
+
+
+class ExecutionCache:
+    """Judge0 results keyed by (code, language, stdin, expected output).
+
+    Finished results are kept for CACHE_TTL_SECONDS in an LRU of at most
+    CACHE_MAX_ENTRIES, so re-running unchanged code answers at once. A
+    submission identical to one still running joins it instead of being
+    sent again (single flight). Timeouts, failed polls and Judge0 internal
+    errors are not cached.
+    """
+
+    def __init__(self, client, poller, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.client = client
+        self.poller = poller
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.results = OrderedDict()  # key -> (finished submission, stored at)
+        self.in_flight = {}           # key -> _Claim for a submission being sent or polled
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+
+    def _lookup(self, key):
+        entry = self.results.get(key)
+        if entry is not None:
+            submission, stored_at = entry
+            if time.time() - stored_at <= self.ttl_seconds:
+                self.results.move_to_end(key)
+                self.hits += 1
+                return submission, "cache"
+            del self.results[key]
+        claim = self.in_flight.get(key)
+        if claim is not None:
+            self.joined += 1
+            return claim, "in_flight"
+        return None, None
+
+    def _store(self, key, submission):
+        # Poller callback for a submission this cache sent
+        with self.lock:
+            self.in_flight.pop(key, None)
+            status_id = ((submission.result or {}).get("status") or {}).get("id")
+            if submission.status != "finished" or status_id in UNCACHEABLE_STATUSES:
+                return
+            self.results[key] = (submission, time.time())
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_entries:
+                self.results.popitem(last=False)
+
+    def _send(self, source_code, language_id, cases, claims):
+        """Submit the claimed cases in batches and hand each claim its submission."""
+        items = list(claims.items())
+        try:
+            for start in range(0, len(items), BATCH_SIZE):
+                batch = items[start:start + BATCH_SIZE]
+                payloads = [{"source_code": source_code, "language_id": language_id,
+                             "stdin": cases[key][0], "expected_output": cases[key][1]} for key, _ in batch]
+                if len(payloads) == 1:
+                    tokens = [self.client.submit(**payloads[0])]
+                else:
+                    tokens = self.client.submit_batch(payloads)
+                for (key, claim), token in zip(batch, tokens):
+                    claim.resolve(self.poller.track(token, lambda submission, key=key: self._store(key, submission)))
+        except Exception:
+            with self.lock:
+                for key, claim in items:
+                    if claim.submission is None:
+                        self.in_flight.pop(key, None)
+                        claim.resolve(None)
+            raise
+
+    def run_many(self, source_code, language_id, cases):
+        """A Submission per (stdin, expected_output) case, in order, and where each came from.
+
+        Cached and in-flight cases are reused; the rest are sent to Judge0 as
+        batches and tracked by the poller. Sources are "cache", "in_flight"
+        or "judge0". Raises what the Judge0 client raises.
+        """
+        keys = [execution_key(source_code, language_id, stdin, expected) for stdin, expected in cases]
+        found, sources = [None] * len(cases), [None] * len(cases)
+        claims = {}
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in claims:
+                    found[i], sources[i] = claims[key], "judge0"
+                    continue
+                found[i], sources[i] = self._lookup(key)
+                if found[i] is None:
+                    # Claimed before the lock is released, so identical requests join this one
+                    claims[key] = self.in_flight[key] = _Claim()
+                    found[i], sources[i] = claims[key], "judge0"
+            self.misses += len(claims)
+
+        if claims:
+            self._send(source_code, language_id, dict(zip(keys, cases)), claims)
+        submissions = [item.wait(self.client.timeout) if isinstance(item, _Claim) else item for item in found]
+        return submissions, sources
+
+    def run(self, source_code, language_id, stdin="", expected_output=None):
+        """(submission, source) for a single execution."""
+        submissions, sources = self.run_many(source_code, language_id, [(stdin, expected_output)])
+        return submissions[0], sources[0]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses + self.joined
+            return {"hits": self.hits, "misses": self.misses, "in_flight_joins": self.joined,
+                    "hit_rate": round((self.hits + self.joined) / lookups, 3) if lookups else None,
+                    "entries": len(self.results), "in_flight": len(self.in_flight)}
@@ -0,0 +1,154 @@
+"""Local stand-in for the Judge0 submissions API, for development and tests.
+
+Implements POST /submissions, POST /submissions/batch, GET /submissions/<token>
+and GET /submissions/batch. Python submissions (language 71) are really run
+with this interpreter; other languages echo their stdin. Each submission stays
+"In Queue" for --delay seconds, then runs on its own thread like a Judge0
+worker. It executes arbitrary code, so it only
+listens on localhost. Run from backend/flask and point the app at it:
+    python -m package.coding_workspace.fake_judge0 --port 2358
+    JUDGE0_URL=http://127.0.0.1:2358 flask run
+"""
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PYTHON_LANGUAGE_ID = 71
+RUN_TIMEOUT_SECONDS = 5
+STATUSES = {
+    1: "In Queue",
+    3: "Accepted",
+    4: "Wrong Answer",
+    5: "Time Limit Exceeded",
+    11: "Runtime Error (NZEC)",
+}
+
+
+class FakeJudge0:
+    """Submissions and request counters shared by the handler threads."""
+
+    def __init__(self, delay=1.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.submissions = {}
+        self.requests = {"submit": 0, "get": 0, "batch_get": 0}
+
+    def submit(self, payload):
+        token = str(uuid.uuid4())
+        with self.lock:
+            self.requests["submit"] += 1
+            self.submissions[token] = {"payload": payload, "result": None}
+        threading.Timer(self.delay, self._run, (token,)).start()
+        return token
+
+    def _run(self, token):
+        submission = self.submissions[token]
+        submission["result"] = self._execute(submission["payload"])
+
+    def _execute(self, payload):
+        started = time.perf_counter()
+        stdin = payload.get("stdin") or ""
+        if payload.get("language_id") != PYTHON_LANGUAGE_ID:
+            stdout, stderr, status = stdin, "", 3
+        else:
+            try:
+                run = subprocess.run([sys.executable, "-c", payload.get("source_code", "")], input=stdin,
+                                     capture_output=True, text=True, timeout=RUN_TIMEOUT_SECONDS)
+                stdout, stderr, status = run.stdout, run.stderr, 3 if run.returncode == 0 else 11
+            except subprocess.TimeoutExpired:
+                stdout, stderr, status = "", "", 5
+        expected = payload.get("expected_output")
+        if status == 3 and expected is not None and stdout.strip() != expected.strip():
+            status = 4
+        return {"stdout": stdout or None, "stderr": stderr or None, "compile_output": None, "message": None,
+                "status": {"id": status, "description": STATUSES[status]},
+                "time": f"{time.perf_counter() - started:.3f}", "memory": 1024}
+
+    def result(self, token):
+        with self.lock:
+            submission = self.submissions.get(token)
+        if submission is None:
+            return None
+        if submission["result"] is None:
+            return {"token": token, "stdout": None, "stderr": None, "compile_output": None, "message": None,
+                    "status": {"id": 1, "description": STATUSES[1]}, "time": None, "memory": None}
+        return {"token": token, **submission["result"]}
+
+    def count(self, kind):
+        with self.lock:
+            self.requests[kind] += 1
+
+
+def make_handler(judge):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        def do_POST(self):
+            path = urlparse(self.path).path.rstrip("/")
+            if path == "/submissions":
+                self._send(201, {"token": judge.submit(self._body())})
+            elif path == "/submissions/batch":
+                self._send(201, [{"token": judge.submit(item)} for item in self._body().get("submissions", [])])
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path.rstrip("/")
+            if path == "/submissions/batch":
+                judge.count("batch_get")
+                tokens = parse_qs(url.query).get("tokens", [""])[0].split(",")
+                self._send(200, {"submissions": [judge.result(token) for token in tokens if token]})
+            elif path.startswith("/submissions/"):
+                judge.count("get")
+                result = judge.result(path.rsplit("/", 1)[1])
+                self._send(404, {"error": "Not found"}) if result is None else self._send(200, result)
+            elif path == "/stats":
+                self._send(200, judge.requests)
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=0, delay=1.0):
+    """Start a fake Judge0 in a background thread; returns (server, judge, base_url)."""
+    judge = FakeJudge0(delay)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(judge))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, judge, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=2358)
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds each submission stays queued")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(FakeJudge0(args.delay)))
+    print(f"Fake Judge0 listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
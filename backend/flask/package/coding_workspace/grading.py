@@ -0,0 +1,124 @@
+import threading
+import time
+import uuid
+
+MAX_TEST_CASES = 100      # Test cases accepted in one grading request
+MAX_CASE_BYTES = 64 * 1024  # Per stdin / expected_output
+ACCEPTED = 3              # Judge0 status id for output matching expected_output
+GRADING_TTL_SECONDS = 3600
+
+
+def parse_test_cases(items):
+    """[(stdin, expected_output)] from JSON, raising ValueError on bad input."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("No test_cases provided")
+    if len(items) > MAX_TEST_CASES:
+        raise ValueError(f"At most {MAX_TEST_CASES} test cases per request")
+    cases = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("stdin", ""), str) \
+                or not isinstance(item.get("expected_output"), str):
+            raise ValueError(f"Invalid test case: {item}")
+        if max(len(item.get("stdin", "")), len(item["expected_output"])) > MAX_CASE_BYTES:
+            raise ValueError("Test case too large")
+        cases.append((item.get("stdin", ""), item["expected_output"]))
+    return cases
+
+
+class GradingRun:
+    """One program run against several test cases, finished when every case is."""
+
+    def __init__(self, cases, on_finish=None):
+        self.id = uuid.uuid4().hex
+        self.cases = cases
+        self.on_finish = on_finish
+        self.submissions = []
+        self.sources = []
+        self.status = "pending"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.lock = threading.Lock()
+        self.remaining = len(cases)
+
+    @property
+    def active(self):
+        return self.status == "pending"
+
+    def case_done(self, submission):
+        # Called from the poller thread once per finished case
+        with self.lock:
+            self.remaining -= 1
+            if self.remaining:
+                return
+            self.status, self.finished_at = "finished", time.time()
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+    def verdicts(self):
+        verdicts = []
+        for (stdin, expected), submission, source in zip(self.cases, self.submissions, self.sources):
+            result = submission.to_dict()
+            judge0_status = (submission.result or {}).get("status") or {}
+            verdicts.append({
+                "stdin": stdin,
+                "expected_output": expected,
+                "passed": judge0_status.get("id") == ACCEPTED,
+                "verdict": result["judge0_status"] or submission.status,
+                "output": result["output"],
+                "errors": result["errors"] or result["error"],
+                "time": float(result["time"]) if result["time"] else None,
+                "memory": result["memory"],
+                "source": source,
+                "wall_seconds": round(submission.finished_at - submission.created_at, 3)
+                if submission.finished_at else None,
+            })
+        return verdicts
+
+    def to_dict(self):
+        verdicts = self.verdicts()
+        times = [verdict["time"] for verdict in verdicts if verdict["time"] is not None]
+        return {
+            "grading_id": self.id,
+            "status": self.status,
+            "passed": sum(verdict["passed"] for verdict in verdicts),
+            "total": len(self.cases),
+            "max_time": max(times, default=None),
+            "wall_seconds": round((self.finished_at or time.time()) - self.created_at, 3),
+            "cases": verdicts,
+        }
+
+
+class GradingManager:
+    """Submits grading runs through the execution cache and keeps them for polling.
+
+    Cases not already cached or running go to Judge0 as batches and are
+    tracked by the shared poller, which fetches them together, so a run
+    takes about as long as its slowest case.
+    """
+
+    def __init__(self, executions):
+        self.executions = executions
+        self.runs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, source_code, language_id, cases, on_finish=None):
+        """Queue every case and return the run; raises what the Judge0 client raises."""
+        run = GradingRun(cases, on_finish)
+        run.submissions, run.sources = self.executions.run_many(source_code, language_id, cases)
+        with self.lock:
+            self._prune()
+            self.runs[run.id] = run
+        # Cached cases call back at once, so callbacks go on only after every submission is known
+        for submission in run.submissions:
+            submission.add_callback(run.case_done)
+        return run
+
+    def get(self, grading_id):
+        with self.lock:
+            return self.runs.get(grading_id)
+
+    def _prune(self):
+        now = time.time()
+        for grading_id in [grading_id for grading_id, run in self.runs.items()
+                           if not run.active and now - run.finished_at > GRADING_TTL_SECONDS]:
+            del self.runs[grading_id]
@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+
+JUDGE0_URL = os.getenv("JUDGE0_URL", "https://judge029.p.rapidapi.com").rstrip("/")
+BATCH_SIZE = 20               # Judge0's default limit on tokens per batch request
+MIN_POLL_SECONDS = 0.25       # Poll interval right after a submission or a finished result
+MAX_POLL_SECONDS = 4.0        # Poll interval ceiling while nothing changes
+SUBMISSION_TIMEOUT_SECONDS = 120  # Pending submissions are given up after this long
+REQUEST_TIMEOUT_SECONDS = 10
+RESULT_TTL_SECONDS = 3600     # Finished submissions are kept this long for polling
+RESULT_FIELDS = "token,stdout,stderr,compile_output,message,status,time,memory"
+PENDING_STATUSES = (1, 2)     # In Queue, Processing
+
+
+def default_headers(base_url=JUDGE0_URL):
+    """Headers for Judge0; RapidAPI hosts also need the key and host headers."""
+    headers = {"Content-Type": "application/json"}
+    host = urlparse(base_url).hostname or ""
+    if host.endswith("rapidapi.com"):
+        headers["x-rapidapi-key"] = os.environ.get("RAPID_API")
+        headers["x-rapidapi-host"] = host
+    return headers
+
+
+class Judge0Client:
+    """Thin wrapper over the Judge0 submissions API; never waits on execution."""
+
+    def __init__(self, base_url=JUDGE0_URL, headers=None, timeout=REQUEST_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers if headers is not None else default_headers(self.base_url)
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def submit(self, source_code, language_id, stdin="", expected_output=None):
+        """Queue one submission and return its token."""
+        payload = {"source_code": source_code, "language_id": language_id, "stdin": stdin}
+        if expected_output is not None:
+            payload["expected_output"] = expected_output
+        response = self.session.post(
+            f"{self.base_url}/submissions", headers=self.headers, timeout=self.timeout,
+            params={"base64_encoded": "false", "wait": "false"}, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        if "token" not in result:
+            raise RuntimeError(f"Judge0 rejected the submission: {result}")
+        return result["token"]
+
+    def submit_batch(self, submissions):
+        """Queue several submissions in one request; returns their tokens in order.
+
+        Each item is a Judge0 submission dict (source_code, language_id,
+        stdin, expected_output). At most BATCH_SIZE items per call.
+        """
+        response = self.session.post(
+            f"{self.base_url}/submissions/batch", headers=self.headers, timeout=self.timeout,
+            params={"base64_encoded": "false"}, json={"submissions": submissions})
+        response.raise_for_status()
+        results = response.json()
+        if not isinstance(results, list) or any("token" not in result for result in results):
+            raise RuntimeError(f"Judge0 rejected the batch: {results}")
+        return [result["token"] for result in results]
+
+    def get_batch(self, tokens):
+        """Current state of up to BATCH_SIZE submissions, in token order."""
+        response = self.session.get(
+            f"{self.base_url}/submissions/batch", headers=self.headers, timeout=self.timeout,
+            params={"tokens": ",".join(tokens), "base64_encoded": "false", "fields": RESULT_FIELDS})
+        response.raise_for_status()
+        payload = response.json()
+        submissions = payload.get("submissions") if isinstance(payload, dict) else None
+        if not isinstance(submissions, list):
+            raise ValueError("Malformed Judge0 batch response")
+        return submissions
+
+
+class Submission:
+    """One Judge0 submission as tracked by the poller."""
+
+    def __init__(self, token, on_finish=None):
+        self.token = token
+        self.callbacks = [on_finish] if on_finish is not None else []
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.changed = threading.Condition()
+
+    @property
+    def active(self):
+        return self.status == "pending"
+
+    def add_callback(self, on_finish):
+        """Run `on_finish(submission)` when it completes, or now if it already has."""
+        with self.changed:
+            if self.active:
+                self.callbacks.append(on_finish)
+                return
+        self._run_callback(on_finish)
+
+    def _run_callback(self, on_finish):
+        # Callbacks write to Mongo; whatever they raise must not reach the poller
+        try:
+            on_finish(self)
+        except Exception as e:
+            print(f"Judge0 callback for {self.token} failed: {e}")
+
+    def finish(self, status, result=None, error=None):
+        with self.changed:
+            self.status, self.result, self.error = status, result, error
+            self.finished_at = time.time()
+            self.changed.notify_all()
+            callbacks, self.callbacks = self.callbacks, []
+        for on_finish in callbacks:
+            self._run_callback(on_finish)
+
+    def to_dict(self):
+        result = self.result or {}
+        return {
+            "token": self.token,
+            "status": self.status,
+            "judge0_status": (result.get("status") or {}).get("description"),
+            "output": result.get("stdout"),
+            "errors": result.get("stderr") or result.get("compile_output"),
+            "time": result.get("time"),
+            "memory": result.get("memory"),
+            "error": self.error,
+        }
+
+
+class Judge0Poller:
+    """A single background thread that polls every pending submission in batches.
+
+    Requests only submit and register tokens; the poller asks Judge0 for up
+    to BATCH_SIZE tokens per call. The interval starts at MIN_POLL_SECONDS,
+    doubles up to MAX_POLL_SECONDS while nothing finishes or Judge0 errors,
+    and drops back when a result arrives or a new token is tracked.
+    """
+
+    def __init__(self, client=None, timeout_seconds=SUBMISSION_TIMEOUT_SECONDS):
+        self.client = client or Judge0Client()
+        self.timeout_seconds = timeout_seconds
+        self.submissions = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.interval = MIN_POLL_SECONDS
+        self.thread = None
+        self.polls = 0
+        self.poll_errors = 0
+
+    def track(self, token, on_finish=None):
+        """Start polling a token; `on_finish(submission)` runs on the poller thread when it completes."""
+        submission = Submission(token, on_finish)
+        with self.lock:
+            self._prune()
+            self.submissions[token] = submission
+            self.interval = MIN_POLL_SECONDS
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="judge0-poller", daemon=True)
+                self.thread.start()
+            self.wakeup.notify()
+        return submission
+
+    def get(self, token):
+        with self.lock:
+            return self.submissions.get(token)
+
+    def _prune(self):
+        now = time.time()
+        for token in [token for token, submission in self.submissions.items()
+                      if not submission.active and now - submission.finished_at > RESULT_TTL_SECONDS]:
+            del self.submissions[token]
+
+    def _pending(self):
+        return [submission for submission in self.submissions.values() if submission.active]
+
+    def _loop(self):
+        while True:
+            with self.lock:
+                self.wakeup.wait_for(lambda: self._pending())
+                # Oldest first, so a long queue cannot starve early submissions
+                pending = sorted(self._pending(), key=lambda submission: submission.created_at)
+            try:
+                finished = self._poll(pending)
+            except Exception as e:
+                # Never let one bad round kill the thread: every pending submission would hang
+                print(f"Judge0 poller round failed: {e}")
+                self.poll_errors += 1
+                finished = 0
+            with self.lock:
+                self.interval = MIN_POLL_SECONDS if finished else min(self.interval * 2, MAX_POLL_SECONDS)
+                # A new token resets the interval and wakes the loop early
+                self.wakeup.wait(self.interval)
+
+    def _poll(self, pending):
+        """One round over the pending submissions; returns how many finished."""
+        finished = 0
+        now = time.time()
+        for submission in pending:
+            if now - submission.created_at > self.timeout_seconds:
+                finished += self._finish(submission, "timeout", error="Timed out waiting for Judge0")
+        pending = [submission for submission in pending if submission.active]
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start:start + BATCH_SIZE]
+            self.polls += 1
+            try:
+                results = self.client.get_batch([submission.token for submission in batch])
+            except (requests.RequestException, ValueError):
+                # Rate limited, unreachable or a garbled reply: keep the tokens and back off
+                self.poll_errors += 1
+                break
+            except Exception as e:
+                print(f"Judge0 batch poll failed: {e}")
+                self.poll_errors += 1
+                for submission in batch:
+                    finished += self._finish(submission, "failed", error="Could not read the Judge0 result")
+                continue
+            for submission, result in zip(batch, results):
+                if result is None:
+                    finished += self._finish(submission, "failed", error="Unknown token")
+                elif not isinstance(result, dict) or not isinstance(result.get("status") or {}, dict):
+                    finished += self._finish(submission, "failed", error="Malformed Judge0 result")
+                elif (result.get("status") or {}).get("id") not in PENDING_STATUSES:
+                    finished += self._finish(submission, "finished", result=result)
+        return finished
+
+    def _finish(self, submission, status, result=None, error=None):
+        submission.finish(status, result, error)
+        return 1
+
+    def stats(self):
+        with self.lock:
+            return {"tracked": len(self.submissions), "pending": len(self._pending()),
+                    "poll_interval_seconds": self.interval, "polls": self.polls,
+                    "poll_errors": self.poll_errors}
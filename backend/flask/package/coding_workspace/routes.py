@@ -1,58 +1,21 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
+import json
 import requests
-import time
-import os
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from .execution_cache import ExecutionCache
+from .grading import GradingManager, parse_test_cases
+from .judge0 import Judge0Client, Judge0Poller
 # Create a Blueprint for internships
 coding_bp = Blueprint("coding_bp", __name__)
 
-# API Details
-API_URL = "https://judge029.p.rapidapi.com/submissions"
-HEADERS = {
-    "x-rapidapi-key": os.environ.get("RAPID_API"),  # Replace with your API key
-    "x-rapidapi-host": "judge029.p.rapidapi.com",
-    "Content-Type": "application/json"
-}
-
-source_code = "name = input()\nprint(f'Hello, {name}')"
-
-
-def fetch_data(code, lang_id):        
-    payload = {
-        "source_code": code,
-        "language_id": lang_id,  # Python 3
-        "stdin": "Judge0",  # Input to program
-    }
-
-    querystring = {"base64_encoded": "false", "wait": "false", "fields": "*"}
-
-    # Step 1: Submit Code
-    response = requests.post(API_URL, json=payload, headers=HEADERS, params=querystring)
-    result = response.json()
-
-    if "token" in result:
-        token = result["token"]
-        print(f"Submission Token: {token}")
-
-        # Step 2: Poll for Execution Result
-        while True:
-            result_response = requests.get(f"{API_URL}/{token}", headers=HEADERS, params=querystring)
-            result_data = result_response.json()
-
-            status_id = result_data.get("status", {}).get("id")
-            if status_id in [1, 2]:
-                print("Processing...")
-                time.sleep(2)
-            else:
-                stdout = result_data.get("stdout", "")
-                stderr = result_data.get("stderr", "")
-
-                print("Output:", stdout)
-                print("Errors:", stderr)
-                return stdout, stderr
-    else:
-        print("Error in submission:", result)
-    return
+# Submissions return a token at once; one background thread polls Judge0 for all of them
+judge0 = Judge0Client()
+poller = Judge0Poller(judge0)
+# Unchanged code re-run with the same input is answered from here, and concurrent
+# identical submissions share one Judge0 execution
+executions = ExecutionCache(judge0, poller)
+grading = GradingManager(executions)
 
 LANGUAGE_ID_MAPPING = {
     "python": 71,  # Python 3
@@ -73,25 +36,113 @@ LANGUAGE_ID_MAPPING = {
 }
 
 
-@coding_bp.route("/", methods=["POST"])
-def get_output():
-    data = request.get_json()
+def parse_submission(data):
+    """(source_code, language_id) from a request body, raising ValueError on bad input."""
     code = data.get("source_code")
-    lang_id = LANGUAGE_ID_MAPPING[data.get("language")]
-    print(lang_id)
-    stdout, stderr = fetch_data(code, lang_id)
+    if not isinstance(code, str) or not code:
+        raise ValueError("No source_code provided")
+    if data.get("language") not in LANGUAGE_ID_MAPPING:
+        raise ValueError(f"Unsupported language: {data.get('language')}")
+    return code, LANGUAGE_ID_MAPPING[data["language"]]
 
-    return jsonify({"output": stdout, "errors": stderr})
+def submit(code, lang_id, on_finish=None):
+    """Run code through the execution cache; returns (response, status)."""
+    try:
+        submission, source = executions.run(code, lang_id, stdin="Judge0")
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        return jsonify({"error": f"Judge0 submission failed: {e}"}), 502
+    if on_finish is not None:
+        submission.add_callback(on_finish)
+    return jsonify({**submission.to_dict(), "source": source}), 200 if source == "cache" else 202
+
+@coding_bp.route("/", methods=["POST"])
+def get_output():
+    # Returns a token right away; poll /submissions/<token> or stream it for the output
+    try:
+        code, lang_id = parse_submission(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return submit(code, lang_id)
 
 @coding_bp.route("/submit-code", methods=["POST"])
 def submit_code():
-    data = request.get_json()
-    user_id = data.get("user_id")
-    code = data.get("source_code")
-    lang_id = LANGUAGE_ID_MAPPING[data.get("language")]
-    stdout, stderr = fetch_data(code, lang_id)
-    result = current_app.db["codes"].insert_one({"user_id": ObjectId(user_id), "output": stdout, "error": stderr, "code": code})
-    if result.inserted_id:
-        print("Code inserted into database")
-        return jsonify("code inserted"), 201
-    return jsonify("error"), 402
+    data = request.get_json(silent=True) or {}
+    try:
+        code, lang_id = parse_submission(data)
+        user_id = ObjectId(str(data.get("user_id", "")))
+    except InvalidId:
+        return jsonify({"error": "Invalid user_id"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    codes = current_app.db["codes"]
+
+    def save(submission):
+        # Runs on the poller thread once Judge0 has a result
+        result = submission.to_dict()
+        codes.insert_one({"user_id": user_id, "output": result["output"], "error": result["errors"],
+                          "code": code, "token": submission.token, "status": submission.status})
+
+    return submit(code, lang_id, on_finish=save)
+
+@coding_bp.route("/grade", methods=["POST"])
+def grade_code():
+    # All test cases go to Judge0 as one batch and are polled together
+    data = request.get_json(silent=True) or {}
+    try:
+        code, lang_id = parse_submission(data)
+        cases = parse_test_cases(data.get("test_cases"))
+        user_id = ObjectId(str(data.get("user_id", "")))
+    except InvalidId:
+        return jsonify({"error": "Invalid user_id"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    codes = current_app.db["codes"]
+
+    def save(run):
+        # One summary document per grading run, written when the last case finishes
+        summary = run.to_dict()
+        codes.insert_one({"user_id": user_id, "code": code, "language": data["language"], **summary})
+
+    try:
+        run = grading.submit(code, lang_id, cases, on_finish=save)
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        return jsonify({"error": f"Judge0 submission failed: {e}"}), 502
+    return jsonify(run.to_dict()), 202
+
+@coding_bp.route("/grade/<grading_id>", methods=["GET"])
+def grading_status(grading_id):
+    run = grading.get(grading_id)
+    if run is None:
+        return jsonify({"error": "Grading run not found"}), 404
+    return jsonify(run.to_dict())
+
+@coding_bp.route("/submissions/<token>", methods=["GET"])
+def submission_status(token):
+    submission = poller.get(token)
+    if submission is None:
+        return jsonify({"error": "Submission not found"}), 404
+    return jsonify(submission.to_dict())
+
+@coding_bp.route("/submissions/<token>/stream", methods=["GET"])
+def stream_submission(token):
+    # One server-sent event when the result is in, with keep-alives until then
+    submission = poller.get(token)
+    if submission is None:
+        return jsonify({"error": "Submission not found"}), 404
+
+    def events():
+        while True:
+            with submission.changed:
+                submission.changed.wait_for(lambda: not submission.active, timeout=15)
+                state = submission.to_dict()
+            if submission.active:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(state)}\n\n"
+            break
+
+    return Response(events(), mimetype="text/event-stream")
+
+@coding_bp.route("/stats", methods=["GET"])
+def judge0_stats():
+    return jsonify({"poller": poller.stats(), "cache": executions.stats()})
@@ -0,0 +1,212 @@
+"""Benchmark suite for the genetic timetable scheduler.
+
+Times every GA operator on its own, then a full run for generations/sec,
+peak memory and final conflicts. Run from backend/flask:
+    python -m package.genetic_algorithm.bench --lectures 50 200 500 --overlap 2 4 --json bench.json
+    python -m package.genetic_algorithm.bench --lectures 500 --profile timetable.prof
+Compare two result files with --compare old.json new.json.
+"""
+import argparse
+import cProfile
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from .scheduler import (
+    IntervalIndex, TimetableProblem, check_conflict, count_conflicts, create_schedule, crossover,
+    evaluate_fitness, evolve, generate_time_slots, initial_population, mutate, next_generation
+)
+from .synthetic import synthetic_lectures, synthetic_rooms
+
+CHECKS_PER_SAMPLE = 1000  # check_conflict calls timed together, it is too fast to time alone
+RATE_GENERATIONS = 200    # Generations timed for the throughput figure
+
+
+def best_of(function, repeat):
+    """Fastest of `repeat` runs in seconds; the minimum is the least noisy estimate."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def time_operators(problem, population_size, repeat, rng):
+    """Seconds per call of every GA operator on this problem."""
+    population = initial_population(problem, population_size, rng)
+    half = population_size // 2
+    parents1, parents2 = population[:half], population[half:2 * half]
+
+    index = IntervalIndex(problem.n_resources)
+    for lecture, gene in enumerate(population[0].tolist()):
+        if gene >= 0:
+            index.add(*problem.placement(lecture, gene))
+    lectures = rng.integers(len(problem.lectures), size=CHECKS_PER_SAMPLE).tolist()
+    genes = rng.integers(problem.n_placements, size=CHECKS_PER_SAMPLE).tolist()
+
+    def checks():
+        for lecture, gene in zip(lectures, genes):
+            check_conflict(problem, index, lecture, gene)
+
+    return {
+        "build_problem": best_of(
+            lambda: TimetableProblem(problem.lectures, problem.time_slots, problem.rooms), repeat),
+        "create_schedule": best_of(lambda: create_schedule(problem, rng), repeat),
+        "check_conflict": best_of(checks, repeat) / CHECKS_PER_SAMPLE,
+        "evaluate_fitness": best_of(lambda: evaluate_fitness(problem, population), repeat),
+        "mutate": best_of(lambda: mutate(problem, population.copy(), rng), repeat),
+        "crossover": best_of(lambda: crossover(parents1, parents2), repeat),
+    }
+
+def generations_per_second(problem, generations, population_size, rng):
+    """Throughput of the generation loop alone, without evolve()'s early stop."""
+    population = initial_population(problem, population_size, rng)
+    start = time.perf_counter()
+    for _ in range(generations):
+        order = np.argsort(-evaluate_fitness(problem, population), kind="stable")
+        population = next_generation(problem, population, order, rng, population_size)
+    return generations / (time.perf_counter() - start)
+
+def run_ga(problem, generations, population_size, seed):
+    """Full GA run; returns the best schedule, its fitness and the generations run."""
+    progress = []
+    best, fitness = evolve(problem, generations=generations, population_size=population_size,
+                           rng=np.random.default_rng(seed),
+                           on_progress=lambda generation, _: progress.append(generation))
+    return best, fitness, len(progress)
+
+def bench(n_lectures, overlap, n_rooms, days, generations, population_size, repeat, seed):
+    lectures = synthetic_lectures(n_lectures, seed=seed, overlap=overlap)
+    rooms = synthetic_rooms(n_rooms, seed=seed) if n_rooms else None
+    time_slots = generate_time_slots(days=days, end_hour=16) if days else generate_time_slots()
+    problem = TimetableProblem(lectures, time_slots, rooms)
+    operators = time_operators(problem, population_size, repeat, np.random.default_rng(seed))
+
+    rate = generations_per_second(problem, min(generations, RATE_GENERATIONS), population_size,
+                                  np.random.default_rng(seed))
+
+    start = time.perf_counter()
+    best, fitness, ran = run_ga(problem, generations, population_size, seed)
+    seconds = time.perf_counter() - start
+
+    # Separate traced run: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    run_ga(problem, generations, population_size, seed)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "lectures": n_lectures,
+        "overlap": overlap,
+        "rooms": n_rooms,
+        "days": days,
+        "time_slots": len(time_slots),
+        "clashing_pairs": len(problem.pair_i),
+        "operators_ms": {name: round(value * 1000, 4) for name, value in operators.items()},
+        "generations_per_second": round(rate, 1),
+        "generations": ran,
+        "seconds": round(seconds, 4),
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+        "fitness": fitness,
+        "conflicts": int(count_conflicts(problem, best)[0]),
+        "unplaced": int((best < 0).sum()),
+    }
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "cpus": os.cpu_count(), "timestamp": time.time()}
+
+def profile(path, n_lectures, overlap, n_rooms, days, generations, population_size, seed):
+    """cProfile dump of a full generate_timetable-style run: compile, evolve, format."""
+    lectures = synthetic_lectures(n_lectures, seed=seed, overlap=overlap)
+    rooms = synthetic_rooms(n_rooms, seed=seed) if n_rooms else None
+    time_slots = generate_time_slots(days=days, end_hour=16) if days else generate_time_slots()
+
+    def generate_timetable():
+        problem = TimetableProblem(lectures, time_slots, rooms)
+        best, _ = evolve(problem, generations=generations, population_size=population_size,
+                         rng=np.random.default_rng(seed))
+        return problem.to_schedule(best)
+
+    profiler = cProfile.Profile()
+    profiler.runcall(generate_timetable)
+    profiler.dump_stats(path)
+    print(f"Profile written to {path} (view with: python -m pstats {path})")
+
+def _config_key(row):
+    return row["lectures"], row["overlap"], row["rooms"], row["days"]
+
+def compare(old_path, new_path):
+    """Print per-operator and end-to-end changes between two result files."""
+    with open(old_path) as f:
+        old = {_config_key(row): row for row in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    for row in new:
+        key = _config_key(row)
+        if key not in old:
+            continue
+        print(f"lectures={key[0]} overlap={key[1]} rooms={key[2]} days={key[3]}")
+        metrics = [(f"{name} ms", old[key]["operators_ms"][name], value)
+                   for name, value in row["operators_ms"].items() if name in old[key]["operators_ms"]]
+        metrics += [(name, old[key][name], row[name])
+                    for name in ("generations_per_second", "peak_memory_mb", "conflicts", "unplaced")]
+        for name, before, after in metrics:
+            change = f"{(after - before) / before:+.1%}" if before else ""
+            print(f"  {name:<24} {before:>12} -> {after:<12} {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lectures", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--overlap", type=float, nargs="+", default=[None],
+                        help="average lectures per mentor and mentee (default: synthetic pool sizes)")
+    parser.add_argument("--rooms", type=int, default=0, help="number of rooms (default: rooms not scheduled)")
+    parser.add_argument("--days", type=int, default=None, help="schedule a week of this many 8:00-16:00 days")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--population-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operator timing, best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--profile", help="write a cProfile dump of a full run on the largest input")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = []
+    print(f"{'lectures':>8} {'overlap':>7} {'create':>8} {'check us':>8} {'fitness':>8} {'mutate':>8} "
+          f"{'crossover':>9} {'gen/s':>8} {'peak MB':>7} {'conflicts':>9} {'unplaced':>8}")
+    for n_lectures in args.lectures:
+        for overlap in args.overlap:
+            row = bench(n_lectures, overlap, args.rooms, args.days, args.generations,
+                        args.population_size, args.repeat, args.seed)
+            results.append(row)
+            ops = row["operators_ms"]
+            print(f"{row['lectures']:>8} {str(row['overlap']):>7} {ops['create_schedule']:>8.3f} "
+                  f"{ops['check_conflict'] * 1000:>8.3f} {ops['evaluate_fitness']:>8.3f} {ops['mutate']:>8.3f} "
+                  f"{ops['crossover']:>9.4f} {row['generations_per_second']:>8} {row['peak_memory_mb']:>7} "
+                  f"{row['conflicts']:>9} {row['unplaced']:>8}")
+    print("Operator columns are milliseconds per call, check_conflict is microseconds.")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "config": vars(args), "results": results}, f, indent=2)
+
+    if args.profile:
+        profile(args.profile, max(args.lectures), args.overlap[-1], args.rooms, args.days,
+                args.generations, args.population_size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Scaling benchmark for the island-model timetable GA.
+
+Run from backend/flask:
+    python -m package.genetic_algorithm.bench_islands --lectures 200 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import time
+from .islands import evolve_islands
+from .scheduler import TimetableProblem, count_conflicts, generate_time_slots
+from .synthetic import synthetic_lectures
+
+
+def run(lectures, workers, islands, generations, population_size, migration_interval, seed):
+    problem = TimetableProblem(lectures, generate_time_slots())
+    start = time.perf_counter()
+    best, fitness = evolve_islands(
+        problem, islands=islands or workers, workers=workers, generations=generations,
+        population_size=population_size, migration_interval=migration_interval, seed=seed
+    )
+    return {
+        "workers": workers,
+        "islands": islands or workers,
+        "seconds": round(time.perf_counter() - start, 3),
+        "fitness": fitness,
+        "conflicts": int(count_conflicts(problem, best)[0]),
+        "unplaced": int((best < 0).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lectures", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--islands", type=int, default=None,
+                        help="fixed island count (default: one island per worker)")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--population-size", type=int, default=20)
+    parser.add_argument("--migration-interval", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"CPUs available: {os.cpu_count()} (worker counts above this are capped)")
+    print(f"{'lectures':>8} {'workers':>7} {'islands':>7} {'seconds':>8} {'fitness':>8} {'conflicts':>9} {'unplaced':>8}")
+    for n_lectures in args.lectures:
+        lectures = synthetic_lectures(n_lectures, seed=args.seed)
+        for workers in args.workers:
+            row = {"lectures": n_lectures, **run(lectures, workers, args.islands, args.generations,
+                                                 args.population_size, args.migration_interval, args.seed)}
+            results.append(row)
+            print(f"{row['lectures']:>8} {row['workers']:>7} {row['islands']:>7} {row['seconds']:>8} "
+                  f"{row['fitness']:>8} {row['conflicts']:>9} {row['unplaced']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
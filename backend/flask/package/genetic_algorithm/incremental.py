@@ -0,0 +1,234 @@
+import threading
+import time
+import numpy as np
+from .scheduler import (
+    IntervalIndex, Lecture, Room, TimetableProblem, check_conflict, count_conflicts, evaluate_fitness
+)
+
+LECTURE_FIELDS = {"title": 1, "mentor": 1, "mentees": 1, "duration": 1}
+DEFAULT_DURATION = 60
+STATE_ID = "latest"
+EJECTION_ATTEMPTS = 32   # Blocking lectures tried per unplaced lecture before giving up
+
+
+def lecture_from_doc(doc):
+    """Lecture from a stored document, raising ValueError if it cannot be scheduled."""
+    duration = doc.get("duration")
+    mentees = doc.get("mentees") or []
+    try:
+        duration = DEFAULT_DURATION if duration is None or duration == "" else int(duration)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid lecture duration: {duration!r}")
+    if duration <= 0:
+        raise ValueError(f"Invalid lecture duration: {duration!r}")
+    if doc.get("mentor") is None or doc.get("mentor") == "":
+        raise ValueError("Lecture has no mentor")
+    if not isinstance(mentees, list):
+        raise ValueError(f"Invalid lecture mentees: {mentees!r}")
+    return Lecture(
+        str(doc.get("title") or doc["_id"]),
+        str(doc["mentor"]),
+        [str(mentee) for mentee in mentees],
+        duration,
+        lecture_id=str(doc["_id"]),
+    )
+
+def lectures_from_docs(docs):
+    """Lectures from stored documents, and the ones skipped as {"lecture_id", "error"}."""
+    lectures, skipped = [], []
+    for doc in docs:
+        try:
+            lectures.append(lecture_from_doc(doc))
+        except ValueError as e:
+            skipped.append({"lecture_id": str(doc["_id"]), "error": str(e)})
+    return lectures, skipped
+
+def load_lectures(collection, query=None):
+    """Lectures from Mongo, fetching only the fields the scheduler needs, and the skipped ones."""
+    return lectures_from_docs(collection.find(query or {}, LECTURE_FIELDS))
+
+def load_rooms(collection):
+    """Rooms from Mongo as Room objects; an empty list means rooms are not scheduled."""
+    return [Room(str(doc.get("name") or doc["_id"]), int(doc["capacity"]))
+            for doc in collection.find({}, {"name": 1, "capacity": 1})]
+
+
+def _place(problem, index, schedule, lecture, gene):
+    schedule[lecture] = gene
+    index.add(*problem.placement(lecture, gene))
+
+def _unplace(problem, index, schedule, lecture):
+    index.remove(*problem.placement(lecture, schedule[lecture]))
+    schedule[lecture] = -1
+
+def _free_placements(problem, index, lecture):
+    free = []
+    people = problem.resources[lecture]
+    for slot in range(len(problem.time_slots)):
+        mask = problem.masks[lecture][slot]
+        if not index.is_free(people, mask):
+            continue
+        if not problem.rooms:
+            free.append(slot)
+            continue
+        free.extend(slot * problem.n_rooms + room for room in problem.room_choices[lecture]
+                    if not index.busy[problem.room_base + room] & mask)
+    return free
+
+def _single_blockers(problem, schedule, lecture):
+    """Placements for `lecture` blocked by exactly one placed lecture, and that lecture."""
+    placed = schedule >= 0
+    placed[lecture] = False
+    start = problem.slot_start[np.where(placed, schedule // problem.n_rooms, 0)]
+    end = start + problem.length
+    candidate_start = problem.slot_start[:, None]
+    candidate_end = candidate_start + problem.length[lecture]
+    overlap = (candidate_start < end) & (start < candidate_end) & placed
+
+    # (slot, room, lecture): people clash in any room, others only in their own room
+    blocking = (overlap & problem.shared[lecture])[:, None, :]
+    if problem.rooms:
+        same_room = (schedule % problem.n_rooms)[None, :] == np.arange(problem.n_rooms)[:, None]
+        blocking = blocking | (overlap[:, None, :] & same_room[None, :, :])
+    single = (blocking.sum(axis=2) == 1) & problem.fits[lecture][None, :]
+    slots, rooms = np.nonzero(single)
+    return slots * problem.n_rooms + rooms, blocking[slots, rooms].argmax(axis=1)
+
+def repair_schedule(problem, schedule, affected, rng=None):
+    """Re-place only the affected lectures, keeping the rest of the timetable fixed.
+
+    `schedule` seeds the search (-1 for new lectures). Lectures that clash in
+    the seed, or could not be placed, are retried too. Each one keeps its old
+    placement when that is still free, else moves to a random free one;
+    failing that, one blocking lecture is moved aside if it can go elsewhere.
+    Returns the repaired schedule and the indices of lectures that moved.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    seed = np.asarray(schedule, dtype=np.int64)
+    schedule = seed.copy()
+
+    # Lectures left out, in a room too small, or clashing with one already
+    # indexed are part of the repair
+    index = IntervalIndex(problem.n_resources)
+    affected = set(int(lecture) for lecture in affected)
+    for lecture in np.argsort(schedule, kind="stable").tolist():
+        gene = int(schedule[lecture])
+        if lecture in affected or gene < 0:
+            continue
+        fits = problem.fits[lecture, gene % problem.n_rooms]
+        if fits and not check_conflict(problem, index, lecture, gene):
+            _place(problem, index, schedule, lecture, gene)
+        else:
+            affected.add(lecture)
+    affected |= set(np.flatnonzero(seed < 0).tolist())
+    order = rng.permutation(sorted(affected)).tolist()
+    schedule[order] = -1
+
+    unplaced = []
+    for lecture in order:
+        free = _free_placements(problem, index, lecture)
+        if not free:
+            unplaced.append(lecture)
+        elif seed[lecture] in free:
+            _place(problem, index, schedule, lecture, int(seed[lecture]))
+        else:
+            _place(problem, index, schedule, lecture, free[rng.integers(len(free))])
+
+    # Local search: make room by moving a single blocking lecture elsewhere
+    for lecture in unplaced:
+        genes, blockers = _single_blockers(problem, schedule, lecture)
+        for candidate in rng.permutation(len(genes))[:EJECTION_ATTEMPTS].tolist():
+            gene, blocker = int(genes[candidate]), int(blockers[candidate])
+            old_gene = int(schedule[blocker])
+            _unplace(problem, index, schedule, blocker)
+            _place(problem, index, schedule, lecture, gene)
+            free = _free_placements(problem, index, blocker)
+            if free:
+                _place(problem, index, schedule, blocker, free[rng.integers(len(free))])
+                break
+            _unplace(problem, index, schedule, lecture)
+            _place(problem, index, schedule, blocker, old_gene)
+
+    return schedule, np.flatnonzero(schedule != seed)
+
+
+class TimetableState:
+    """Last best timetable, kept in memory and mirrored to the `timetables` collection."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.problem = None
+        self.schedule = None
+        self.updated_at = None
+
+    def update(self, problem, schedule, collection=None):
+        with self.lock:
+            self.problem = problem
+            self.schedule = np.asarray(schedule, dtype=np.int64)
+            self.updated_at = time.time()
+            if collection is not None:
+                collection.replace_one({"_id": STATE_ID}, {
+                    "slots": {lecture.lecture_id: int(slot)
+                              for lecture, slot in zip(problem.lectures, self.schedule)},
+                    "fitness": int(evaluate_fitness(problem, self.schedule)[0]),
+                    "time_slots": [list(slot) for slot in problem.time_slots],
+                    "rooms": [{"name": room.name, "capacity": room.capacity} for room in problem.rooms],
+                    "updated_at": self.updated_at,
+                }, upsert=True)
+
+    def restore(self, lectures, time_slots, collection):
+        """Rebuild the state from the last persisted timetable, if there is one.
+
+        Slots and rooms saved with the timetable win over `time_slots`, since
+        the stored placements index into them.
+        """
+        with self.lock:
+            saved = collection.find_one({"_id": STATE_ID})
+            if saved is None:
+                return False
+            rooms = [Room(room["name"], room["capacity"]) for room in saved.get("rooms", [])]
+            problem = TimetableProblem(lectures, saved.get("time_slots") or time_slots, rooms)
+            seed = [saved["slots"].get(lecture.lecture_id, -1) for lecture in lectures]
+            self.problem = problem
+            self.schedule = np.array(seed, dtype=np.int64)
+            self.updated_at = saved.get("updated_at")
+            return True
+
+    def summary(self):
+        problem, schedule = self.problem, self.schedule
+        return {
+            "lectures": len(problem.lectures),
+            "conflicts": int(count_conflicts(problem, schedule)[0]),
+            "unplaced": int((schedule < 0).sum()),
+            "fitness": int(evaluate_fitness(problem, schedule)[0]),
+            "updated_at": self.updated_at,
+        }
+
+    def apply_changes(self, changed_ids, docs, collection=None, rng=None):
+        """Swap in re-fetched lecture documents and repair around them.
+
+        `changed_ids` are the lecture ids touched by the edit; any of them
+        missing from `docs`, or no longer valid, leave the timetable. Returns
+        the titles of moved lectures and the skipped documents.
+        """
+        with self.lock:
+            lectures, skipped = lectures_from_docs(docs)
+            fresh = {lecture.lecture_id: lecture for lecture in lectures}
+            changed_ids = set(changed_ids) | set(fresh)
+            old_slots = {lecture.lecture_id: int(slot)
+                         for lecture, slot in zip(self.problem.lectures, self.schedule)}
+
+            lectures = []
+            for lecture in self.problem.lectures:
+                if lecture.lecture_id not in changed_ids:
+                    lectures.append(lecture)
+                elif lecture.lecture_id in fresh:
+                    lectures.append(fresh.pop(lecture.lecture_id))
+            lectures.extend(fresh.values())
+
+            problem = TimetableProblem(lectures, self.problem.time_slots, self.problem.rooms)
+            seed = [old_slots.get(lecture.lecture_id, -1) for lecture in lectures]
+            affected = [i for i, lecture in enumerate(lectures) if lecture.lecture_id in changed_ids]
+            schedule, moved = repair_schedule(problem, seed, affected, rng=rng)
+            self.update(problem, schedule, collection)
+            return [lectures[i].title for i in moved], skipped
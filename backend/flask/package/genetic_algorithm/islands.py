@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from .scheduler import TimetableProblem, evaluate_fitness, initial_population, next_generation
+
+ISLAND_POOL_WORKERS = int(os.getenv("TIMETABLE_ISLAND_WORKERS", "0")) or os.cpu_count() or 1
+WORKER_PROBLEMS = 4  # Compiled problems a worker process keeps, one per recent job
+
+_island_pool = None
+_island_pool_lock = threading.Lock()
+# Problems compiled inside a worker process, keyed by job
+_worker_problems = {}
+
+
+def island_pool():
+    """Process pool shared by every island job, started on first use.
+
+    Jobs run on threads of a threaded server, and forking there can copy a
+    lock another thread holds into the child; workers are started by a
+    forkserver (spawn where there is none) instead.
+    """
+    global _island_pool
+    with _island_pool_lock:
+        if _island_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _island_pool = ProcessPoolExecutor(max_workers=ISLAND_POOL_WORKERS,
+                                               mp_context=multiprocessing.get_context(method))
+        return _island_pool
+
+
+def _discard_pool(pool):
+    # A worker died; the next job starts a fresh pool
+    global _island_pool
+    with _island_pool_lock:
+        if _island_pool is pool:
+            _island_pool = None
+
+
+def _worker_problem(key, problem_args):
+    problem = _worker_problems.get(key)
+    if problem is None:
+        if len(_worker_problems) >= WORKER_PROBLEMS:
+            del _worker_problems[next(iter(_worker_problems))]
+        problem = _worker_problems[key] = TimetableProblem(*problem_args)
+    return problem
+
+
+def _evolve_island(key, problem_args, population, rng, generations, population_size):
+    """Evolve one island for a migration interval inside a worker process."""
+    problem = _worker_problem(key, problem_args)
+    for _ in range(generations):
+        fitness = evaluate_fitness(problem, population)
+        order = np.argsort(-fitness, kind="stable")
+        if fitness[order[0]] == 0:
+            break
+        population = next_generation(problem, population, order, rng, population_size)
+    return population, rng
+
+
+def migrate(problem, populations, migrants):
+    """Ring migration: each island's best schedules replace the next island's worst."""
+    ranked = []
+    for population in populations:
+        ranked.append(population[np.argsort(-evaluate_fitness(problem, population), kind="stable")])
+    for island, population in enumerate(ranked):
+        source = ranked[island - 1]
+        population[len(population) - migrants:] = source[:migrants]
+    return ranked
+
+
+def evolve_islands(problem, islands=4, workers=None, generations=1000, population_size=20,
+                   migration_interval=50, migrants=2, seed=None, patience=None,
+                   on_progress=None, should_stop=None):
+    """Island-model GA: populations evolve in a process pool and exchange their best.
+
+    Each island owns an RNG spawned from `seed`, so results for a given seed
+    and island count are the same whatever the number of worker processes.
+    The pool is shared by all jobs; `workers` caps how many of this job's
+    islands run at once. Returns the global best schedule and its fitness.
+    """
+    workers = min(workers or islands, islands, ISLAND_POOL_WORKERS)
+    migrants = min(migrants, population_size // 2)
+    rngs = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(islands)]
+    populations = [initial_population(problem, population_size, rng) for rng in rngs]
+    best_fitness, stale_generations, done = None, 0, 0
+    key = uuid.uuid4().hex
+    problem_args = (problem.lectures, problem.time_slots, problem.rooms)
+
+    pool = island_pool()
+    try:
+        while done < generations:
+            step = min(migration_interval, generations - done)
+            results = []
+            for start in range(0, islands, workers):
+                stop = min(start + workers, islands)
+                results.extend(pool.map(_evolve_island, [key] * (stop - start), [problem_args] * (stop - start),
+                                        populations[start:stop], rngs[start:stop],
+                                        [step] * (stop - start), [population_size] * (stop - start)))
+            populations = [population for population, _ in results]
+            rngs = [rng for _, rng in results]
+            done += step
+
+            island_best = max(int(evaluate_fitness(problem, population).max()) for population in populations)
+            if best_fitness is None or island_best > best_fitness:
+                best_fitness, stale_generations = island_best, 0
+            else:
+                stale_generations += step
+            if on_progress is not None:
+                on_progress(done, best_fitness)
+            if best_fitness == 0 or (patience and stale_generations >= patience):
+                break
+            if should_stop is not None and should_stop():
+                break
+            if migrants > 0 and islands > 1:
+                populations = migrate(problem, populations, migrants)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+    candidates = np.concatenate(populations)
+    fitness = evaluate_fitness(problem, candidates)
+    best = int(fitness.argmax())
+    return candidates[best], int(fitness[best])
@@ -0,0 +1,128 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .scheduler import evolve
+from .islands import evolve_islands
+
+MAX_WORKERS = 2          # Timetable runs executing at once
+MAX_ACTIVE_JOBS = 16     # Queued + running jobs accepted before rejecting new ones
+JOB_TTL_SECONDS = 3600   # Finished jobs are kept this long for polling
+
+
+class TimetableJob:
+    """State of one background timetable run, shared with the polling endpoints."""
+
+    def __init__(self, problem, options, on_finish=None):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.options = options
+        self.on_finish = on_finish
+        self.status = "queued"
+        self.generation = 0
+        self.best_fitness = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self.changed = threading.Condition()
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "generation": self.generation,
+            "best_fitness": self.best_fitness,
+            "elapsed_seconds": round(self.elapsed(), 4),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs timetable jobs on a bounded thread pool, away from the web workers."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_active=MAX_ACTIVE_JOBS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="timetable")
+        self.max_active = max_active
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, problem, on_finish=None, **options):
+        """Queue a run; returns None when too many jobs are already active.
+
+        `on_finish(best_schedule, fitness)` is called when a run completes.
+        """
+        with self.lock:
+            self._prune()
+            if sum(job.active for job in self.jobs.values()) >= self.max_active:
+                return None
+            job = TimetableJob(problem, options, on_finish)
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancelled.set()
+        return job
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if not job.active and now - job.finished_at > JOB_TTL_SECONDS]:
+            del self.jobs[job_id]
+
+    def _run(self, job):
+        if job.cancelled.is_set():
+            job.update(status="cancelled", finished_at=time.time())
+            return
+        job.update(status="running", started_at=time.time())
+        try:
+            options = dict(job.options)
+            islands = options.pop("islands", 1)
+            seed = options.pop("seed", None)
+            hooks = {
+                "on_progress": lambda generation, best_fitness: job.update(
+                    generation=generation, best_fitness=best_fitness),
+                "should_stop": job.cancelled.is_set,
+            }
+            if islands > 1:
+                best, fitness = evolve_islands(job.problem, islands=islands, seed=seed, **options, **hooks)
+            else:
+                options.pop("workers", None)
+                options.pop("migration_interval", None)
+                best, fitness = evolve(job.problem, rng=np.random.default_rng(seed), **options, **hooks)
+            if job.on_finish is not None and not job.cancelled.is_set():
+                job.on_finish(best, fitness)
+            job.update(
+                status="cancelled" if job.cancelled.is_set() else "finished",
+                best_fitness=fitness,
+                result=job.problem.to_schedule(best),
+                finished_at=time.time(),
+            )
+        except Exception as e:
+            job.update(status="failed", error=str(e), finished_at=time.time())
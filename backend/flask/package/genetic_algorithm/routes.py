@@ -1,101 +1,82 @@
-from flask import Blueprint, request, jsonify, current_app
-import random
+from flask import Blueprint, Response, request, jsonify, current_app
+import json
+import time
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from .scheduler import Lecture, Room, TimetableProblem, evolve, generate_time_slots
+from .jobs import JobManager
+from .incremental import LECTURE_FIELDS, TimetableState, load_lectures, load_rooms
 
 genetic_bp = Blueprint("genetic_bp", __name__)
-
-class Lecture:
-    def __init__(self, title, mentor, mentees, duration):
-        self.title = title
-        self.mentor = mentor
-        self.mentees = mentees
-        self.duration = duration
-
-    def __repr__(self):
-        return f"{self.title} (Duration: {self.duration} mins)"
-
-def generate_time_slots():
-    """Generate available time slots from 8:00 to 15:00 in 30-minute intervals."""
-    slots = []
-    for start_hour in range(8, 15):
-        for start_min in [0, 30]:
-            slots.append((start_hour, start_min))
-    return slots
-
-def check_conflict(schedule, lecture, slot):
-    """Check if assigning a lecture to a slot causes conflicts."""
-    start_hour, start_min = slot
-    end_hour = start_hour + (start_min + lecture.duration) // 60
-    end_min = (start_min + lecture.duration) % 60
-    new_range = [(h, m) for h in range(start_hour, end_hour + 1)
-                 for m in (0, 30) if (h, m) >= (start_hour, start_min) and (h, m) <= (end_hour, end_min)]
-
-    for existing in schedule.values():
-        existing_range = [(h, m) for h in range(existing['start'][0], existing['end'][0] + 1)
-                          for m in (0, 30) if (h, m) >= existing['start'] and (h, m) <= existing['end']]
-
-        if (lecture.mentor == existing['mentor'] or set(lecture.mentees) & set(existing['mentees'])):
-            if any(time in existing_range for time in new_range):
-                return True  # Conflict detected
-    return False
-
-def create_schedule(lectures, time_slots):
-    """Create a conflict-free schedule using a greedy approach."""
-    schedule = {}
-    random.shuffle(time_slots)
-
-    for lecture in lectures:
-        for slot in time_slots:
-            if not check_conflict(schedule, lecture, slot):
-                end_hour = slot[0] + (slot[1] + lecture.duration) // 60
-                end_min = (slot[1] + lecture.duration) % 60
-                schedule[lecture.title] = {
-                    'start': slot,
-                    'end': (end_hour, end_min),
-                    'mentor': lecture.mentor,
-                    'mentees': lecture.mentees
-                }
-                break  # Move to the next lecture
-    return schedule
-
-def evaluate_fitness(schedule):
-    """Evaluate the fitness of a schedule based on the number of conflicts."""
-    conflicts = 0
-    for lecture1 in schedule.values():
-        for lecture2 in schedule.values():
-            if lecture1 == lecture2:
-                continue
-            if (lecture1['mentor'] == lecture2['mentor'] or set(lecture1['mentees']) & set(lecture2['mentees'])):
-                if times_overlap(lecture1, lecture2):
-                    conflicts += 1
-    return -conflicts  # Lower conflicts mean higher fitness
-
-def times_overlap(lecture1, lecture2):
-    """Check if two lectures overlap."""
-    return not (lecture1['end'] <= lecture2['start'] or lecture2['end'] <= lecture1['start'])
-
-def mutate(schedule, lectures, time_slots):
-    """Mutate a schedule by reassigning a random lecture to a new non-conflicting time slot."""
-    random_lecture = random.choice(lectures)
-    for new_slot in random.sample(time_slots, len(time_slots)):
-        if not check_conflict(schedule, random_lecture, new_slot):
-            end_hour = new_slot[0] + (new_slot[1] + random_lecture.duration) // 60
-            end_min = (new_slot[1] + random_lecture.duration) % 60
-            schedule[random_lecture.title] = {
-                'start': new_slot,
-                'end': (end_hour, end_min),
-                'mentor': random_lecture.mentor,
-                'mentees': random_lecture.mentees
-            }
-            return schedule
-    return schedule
-
-def crossover(schedule1, schedule2):
-    """Perform crossover by swapping half of the schedule entries."""
-    keys = list(schedule1.keys())
-    crossover_point = len(keys) // 2
-    for key in keys[:crossover_point]:
-        schedule1[key], schedule2[key] = schedule2[key], schedule1[key]
-    return schedule1, schedule2
+# Caps keep one job from holding a timetable worker indefinitely
+MAX_GENERATIONS = 20000
+MAX_POPULATION_SIZE = 1000
+MAX_ISLANDS = 16
+MAX_DAYS = 7  # Masks and conflict tables grow with the number of time slots
+TIME_SLOT_STEPS = (15, 30, 60)  # Minutes
+job_manager = JobManager()
+timetable_state = TimetableState()
+
+def parse_lectures(items):
+    """Build Lecture objects from JSON, raising ValueError on bad input."""
+    if not items:
+        raise ValueError("No lectures provided")
+    lectures = []
+    for item in items:
+        try:
+            lectures.append(Lecture(str(item["title"]), str(item["mentor"]),
+                                    [str(mentee) for mentee in item.get("mentees", [])],
+                                    int(item["duration"])))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid lecture: {item}")
+        if lectures[-1].duration <= 0:
+            raise ValueError(f"Invalid lecture duration: {item}")
+    return lectures
+
+def parse_rooms(items):
+    """Build Room objects from JSON, raising ValueError on bad input."""
+    rooms = []
+    for item in items or []:
+        try:
+            rooms.append(Room(str(item["name"]), int(item["capacity"])))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid room: {item}")
+        if rooms[-1].capacity <= 0:
+            raise ValueError(f"Invalid room capacity: {item}")
+    return rooms
+
+def parse_bounded(data, name, default, low, high):
+    """Integer option within [low, high], raising ValueError otherwise."""
+    value = data.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+def parse_time_slots(data):
+    """Time slots for the requested days and hours (one day, 8:00-15:00 by default)."""
+    days = parse_bounded(data, "days", None, 1, MAX_DAYS)
+    start_hour = parse_bounded(data, "start_hour", 8, 0, 24)
+    end_hour = parse_bounded(data, "end_hour", 15, 0, 24)
+    step = parse_bounded(data, "step", 30, min(TIME_SLOT_STEPS), max(TIME_SLOT_STEPS))
+    if step not in TIME_SLOT_STEPS:
+        raise ValueError(f"step must be one of {', '.join(map(str, TIME_SLOT_STEPS))}")
+    if start_hour >= end_hour:
+        raise ValueError("start_hour must be before end_hour")
+    return generate_time_slots(start_hour=start_hour, end_hour=end_hour, step=step, days=days)
+
+def parse_ga_options(data):
+    """Generations, population size and patience for a GA run, raising ValueError on bad input."""
+    return {
+        "generations": parse_bounded(data, "generations", 1000, 1, MAX_GENERATIONS),
+        "population_size": parse_bounded(data, "population_size", 20, 2, MAX_POPULATION_SIZE),
+        "patience": parse_bounded(data, "patience", None, 0, MAX_GENERATIONS),
+    }
 
 @genetic_bp.route("/", methods=["GET"])
 def generate_timetable():
@@ -133,23 +114,140 @@ def generate_timetable():
     ]
 
     # Generate available time slots
-    time_slots = generate_time_slots()
-
-    # Generate initial population
-    population = [create_schedule(lectures, time_slots) for _ in range(population_size)]
-
-    # Run genetic algorithm
-    for generation in range(generations):
-        population.sort(key=evaluate_fitness, reverse=True)
-        population = population[:population_size // 2]
-        new_population = population.copy()
-        while len(new_population) < population_size:
-            parent1, parent2 = random.sample(population, 2)
-            child1, child2 = crossover(parent1.copy(), parent2.copy())
-            new_population.append(mutate(child1, lectures, time_slots))
-            new_population.append(mutate(child2, lectures, time_slots))
-        population = new_population
-
-    # Best schedule output
-    best_schedule = population[0]
-    return jsonify(best_schedule)
\ No newline at end of file
+    problem = TimetableProblem(lectures, generate_time_slots())
+
+    # Run genetic algorithm (population evaluated as one array per generation)
+    best_schedule, _ = evolve(problem, generations=generations, population_size=population_size)
+    return jsonify(problem.to_schedule(best_schedule))
+
+@genetic_bp.route("/jobs", methods=["POST"])
+def create_job():
+    data = request.get_json() or {}
+    try:
+        lectures = parse_lectures(data.get("lectures"))
+        rooms = parse_rooms(data.get("rooms"))
+        time_slots = parse_time_slots(data)
+        options = {
+            **parse_ga_options(data),
+            # Island model: several populations evolving in a process pool
+            "islands": parse_bounded(data, "islands", 1, 1, MAX_ISLANDS),
+            "workers": parse_bounded(data, "workers", None, 1, MAX_ISLANDS),
+            "migration_interval": parse_bounded(data, "migration_interval", 50, 1, MAX_GENERATIONS),
+            "seed": parse_bounded(data, "seed", None, 0, 2 ** 63 - 1),
+        }
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job = job_manager.submit(TimetableProblem(lectures, time_slots, rooms), **options)
+    if job is None:
+        return jsonify({"error": "Too many timetable jobs running, try again later"}), 429
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+@genetic_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@genetic_bp.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@genetic_bp.route("/jobs/<job_id>/stream", methods=["GET"])
+def stream_job(job_id):
+    # Server-sent progress events until the job finishes
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        while True:
+            with job.changed:
+                # Wake on completion, otherwise report progress a few times a second
+                job.changed.wait_for(lambda: not job.active, timeout=0.25)
+                state = job.to_dict()
+            yield f"data: {json.dumps(state)}\n\n"
+            if not job.active:
+                break
+
+    return Response(events(), mimetype="text/event-stream")
+
+@genetic_bp.route("/schedule", methods=["POST"])
+def schedule_lectures():
+    # Full GA run over the lectures collection; the result becomes the current timetable
+    data = request.get_json(silent=True) or {}
+    db = current_app.db
+    lectures, skipped = load_lectures(db["lectures"])
+    if not lectures:
+        return jsonify({"error": "No valid lectures found", "skipped": skipped}), 404
+    try:
+        time_slots = parse_time_slots(data)
+        options = parse_ga_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    problem = TimetableProblem(lectures, time_slots, load_rooms(db["rooms"]))
+    job = job_manager.submit(
+        problem,
+        on_finish=lambda best, fitness: timetable_state.update(problem, best, db["timetables"]),
+        **options,
+    )
+    if job is None:
+        return jsonify({"error": "Too many timetable jobs running, try again later"}), 429
+    return jsonify({"job_id": job.id, "status": job.status, "skipped": skipped}), 202
+
+@genetic_bp.route("/schedule", methods=["GET"])
+def get_schedule():
+    skipped = []
+    with timetable_state.lock:
+        if timetable_state.problem is None:
+            db = current_app.db
+            lectures, skipped = load_lectures(db["lectures"])
+            if not timetable_state.restore(lectures, generate_time_slots(), db["timetables"]):
+                return jsonify({"error": "No timetable yet, POST /schedule first"}), 404
+        return jsonify({**timetable_state.summary(), "skipped": skipped,
+                        "timetable": timetable_state.problem.to_schedule(timetable_state.schedule)})
+
+@genetic_bp.route("/reschedule", methods=["POST"])
+def reschedule():
+    # Repair the current timetable after one lecture, mentor or mentee changed
+    data = request.get_json() or {}
+    db = current_app.db
+    start = time.perf_counter()
+    restore_skipped = []
+    with timetable_state.lock:
+        if timetable_state.problem is None:
+            lectures, restore_skipped = load_lectures(db["lectures"])
+            if not timetable_state.restore(lectures, generate_time_slots(), db["timetables"]):
+                return jsonify({"error": "No timetable yet, POST /schedule first"}), 404
+
+        if data.get("lecture_id"):
+            try:
+                lecture_id = ObjectId(data["lecture_id"])
+            except (InvalidId, TypeError):
+                return jsonify({"error": "Invalid lecture_id"}), 400
+            changed_ids = {str(lecture_id)}
+            docs = list(db["lectures"].find({"_id": lecture_id}, LECTURE_FIELDS))
+        elif data.get("mentor") or data.get("mentee"):
+            person = str(data.get("mentor") or data.get("mentee"))
+            field = "mentor" if data.get("mentor") else "mentees"
+            # Lectures that involved the person before the edit, plus those that do now
+            changed_ids = {lecture.lecture_id for lecture in timetable_state.problem.lectures
+                           if (lecture.mentor == person if field == "mentor" else person in lecture.mentees)}
+            # Ids come from stored lectures; any that are not ObjectIds are matched as stored
+            stored_ids = [ObjectId(lecture_id) if ObjectId.is_valid(lecture_id) else lecture_id
+                          for lecture_id in changed_ids]
+            docs = list(db["lectures"].find({"$or": [
+                {"_id": {"$in": stored_ids}},
+                {field: person},
+            ]}, LECTURE_FIELDS))
+        else:
+            return jsonify({"error": "Provide lecture_id, mentor or mentee"}), 400
+
+        moved, skipped = timetable_state.apply_changes(changed_ids, docs, db["timetables"])
+        return jsonify({**timetable_state.summary(), "moved": moved, "skipped": restore_skipped + skipped,
+                        "seconds": round(time.perf_counter() - start, 4)})
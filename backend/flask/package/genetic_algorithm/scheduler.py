@@ -0,0 +1,318 @@
+import math
+import numpy as np
+
+UNPLACED_PENALTY = 2  # A lecture left out costs as much as one clashing pair
+
+
+class Lecture:
+    def __init__(self, title, mentor, mentees, duration, lecture_id=None):
+        self.title = title
+        self.mentor = mentor
+        self.mentees = mentees
+        self.duration = duration
+        self.lecture_id = lecture_id  # Mongo _id when loaded from the lectures collection
+
+    def __repr__(self):
+        return f"{self.title} (Duration: {self.duration} mins)"
+
+class Room:
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity  # Seats, counting the mentor
+
+    def __repr__(self):
+        return f"{self.name} (Capacity: {self.capacity})"
+
+def generate_time_slots(start_hour=8, end_hour=15, step=30, days=None):
+    """Generate available time slots from 8:00 to 15:00 in 30-minute intervals.
+
+    With `days`, slots repeat on every day as (day, hour, minute) tuples, e.g.
+    days=5, end_hour=16 gives a 40-hour week.
+    """
+    slots = []
+    for minute in range(start_hour * 60, end_hour * 60, step):
+        slots.append((minute // 60, minute % 60))
+    if days is None:
+        return slots
+    return [(day, hour, minute) for day in range(days) for hour, minute in slots]
+
+def _slot_minutes(slot):
+    day, hour, minute = slot if len(slot) == 3 else (0, *slot)
+    return day * 24 * 60 + hour * 60 + minute
+
+
+class IntervalIndex:
+    """Busy time of every resource (mentor, mentee or room) as one bitmask.
+
+    Bit t is set while the resource is busy during tick t, so checking a
+    placement for overlaps is a single AND per resource however many
+    lectures are already placed.
+    """
+
+    def __init__(self, n_resources):
+        self.busy = [0] * n_resources
+
+    def is_free(self, resources, mask):
+        return not any(self.busy[resource] & mask for resource in resources)
+
+    def add(self, resources, mask):
+        for resource in resources:
+            self.busy[resource] |= mask
+
+    def remove(self, resources, mask):
+        # Exact because placed lectures never overlap on a shared resource
+        for resource in resources:
+            self.busy[resource] &= ~mask
+
+
+class TimetableProblem:
+    """Lectures, time slots and rooms compiled into arrays for vectorized scheduling.
+
+    A schedule is an int array holding one placement per lecture, or -1 when
+    the lecture could not be placed. A placement is `slot * n_rooms + room`;
+    without rooms n_rooms is 1 and it is just the time-slot index. Times are
+    counted in ticks, the largest step dividing every slot offset and lecture
+    duration, and every lecture occupies the half-open tick interval
+    [start, start + length).
+    """
+
+    def __init__(self, lectures, time_slots, rooms=None):
+        self.lectures = list(lectures)
+        self.time_slots = [tuple(slot) for slot in time_slots]
+        self.rooms = list(rooms or [])
+        self.n_rooms = max(len(self.rooms), 1)
+        self.n_placements = len(self.time_slots) * self.n_rooms
+
+        minutes = np.array([_slot_minutes(slot) for slot in self.time_slots], dtype=np.int64)
+        durations = np.array([lecture.duration for lecture in self.lectures], dtype=np.int64)
+        self.day_start = int(minutes.min())
+        self.tick = math.gcd(*(minutes - self.day_start).tolist(), *durations.tolist()) or 1
+        self.slot_start = (minutes - self.day_start) // self.tick
+        self.length = durations // self.tick
+
+        # Every mentor and mentee is a resource that can hold one lecture at a time
+        resource_ids = {}
+        self.resources = []
+        for lecture in self.lectures:
+            people = [("mentor", lecture.mentor)] + [("mentee", mentee) for mentee in lecture.mentees]
+            self.resources.append(sorted({resource_ids.setdefault(person, len(resource_ids)) for person in people}))
+        # Rooms come after the people; a lecture only fits rooms with a seat for everyone
+        self.room_base = len(resource_ids)
+        self.n_resources = self.room_base + len(self.rooms)
+        attendees = np.array([len(lecture.mentees) + 1 for lecture in self.lectures], dtype=np.int64)
+        if self.rooms:
+            capacity = np.array([room.capacity for room in self.rooms], dtype=np.int64)
+            self.fits = attendees[:, None] <= capacity[None, :]
+            by_size = np.argsort(capacity, kind="stable")
+            # Smallest fitting room first, so large rooms stay free for large lectures
+            self.room_choices = [[int(room) for room in by_size if fits[room]] for fits in self.fits]
+        else:
+            self.fits = np.ones((len(self.lectures), 1), dtype=bool)
+            self.room_choices = [[0] for _ in self.lectures]
+
+        # Lectures that clash whenever they overlap in time
+        n_lectures = len(self.lectures)
+        self.shared = np.zeros((n_lectures, n_lectures), dtype=bool)
+        by_resource = [[] for _ in range(self.room_base)]
+        for lecture, resources in enumerate(self.resources):
+            for resource in resources:  # People only; rooms are chosen per placement
+                by_resource[resource].append(lecture)
+        for lectures in by_resource:
+            self.shared[np.ix_(lectures, lectures)] = True
+        np.fill_diagonal(self.shared, False)
+        self.pair_i, self.pair_j = np.nonzero(np.triu(self.shared, 1))
+
+        # Occupancy bitmask of every (lecture, slot) placement, one bit per tick
+        self.masks = [[((1 << int(length)) - 1) << int(start) for start in self.slot_start]
+                      for length in self.length]
+
+    def placement(self, lecture, gene):
+        """Resources and tick mask a lecture occupies at a placement."""
+        slot, room = divmod(int(gene), self.n_rooms)
+        resources = self.resources[lecture]
+        if self.rooms:
+            resources = resources + [self.room_base + room]
+        return resources, self.masks[lecture][slot]
+
+    def to_schedule(self, schedule):
+        """Convert a placement array into the {title: {...}} response format."""
+        result = {}
+        for lecture, gene in zip(self.lectures, schedule):
+            if gene < 0:
+                continue
+            slot, room = divmod(int(gene), self.n_rooms)
+            *day, start_hour, start_min = self.time_slots[slot]
+            end = start_hour * 60 + start_min + lecture.duration
+            result[lecture.title] = {
+                'start': (start_hour, start_min),
+                'end': (end // 60, end % 60),
+                'mentor': lecture.mentor,
+                'mentees': lecture.mentees
+            }
+            if day:
+                result[lecture.title]['day'] = day[0]
+            if self.rooms:
+                result[lecture.title]['room'] = self.rooms[room].name
+        return result
+
+
+def check_conflict(problem, index, lecture, gene):
+    """Check if a placement overlaps anything its people or room are already busy with."""
+    return not index.is_free(*problem.placement(lecture, gene))
+
+def find_placement(problem, index, lecture, slot_order):
+    """First free placement trying slots in `slot_order`, or -1."""
+    people = problem.resources[lecture]
+    for slot in slot_order:
+        mask = problem.masks[lecture][slot]
+        if not index.is_free(people, mask):
+            continue
+        if not problem.rooms:
+            return slot
+        for room in problem.room_choices[lecture]:
+            if not index.busy[problem.room_base + room] & mask:
+                return slot * problem.n_rooms + room
+    return -1
+
+def create_schedule(problem, rng):
+    """Create a conflict-free schedule using a greedy approach."""
+    index = IntervalIndex(problem.n_resources)
+    schedule = np.full(len(problem.lectures), -1, dtype=np.int64)
+    slot_order = rng.permutation(len(problem.time_slots)).tolist()
+
+    for lecture in range(len(problem.lectures)):
+        gene = find_placement(problem, index, lecture, slot_order)
+        if gene >= 0:
+            schedule[lecture] = gene
+            index.add(*problem.placement(lecture, gene))
+    return schedule
+
+def _intervals(problem, population):
+    placed = population >= 0
+    start = problem.slot_start[np.where(placed, population // problem.n_rooms, 0)]
+    return placed, start, start + problem.length
+
+def _room_clashes(problem, population, placed, start, end):
+    """Overlapping pairs of lectures in the same room, per schedule.
+
+    Placed lectures are sorted by (schedule, room, start); each one then
+    counts the lectures after it in its room that start before it ends,
+    which counts every overlapping pair exactly once.
+    """
+    n_schedules = len(population)
+    span = int(end.max(initial=0)) + 1
+    bucket = np.arange(n_schedules)[:, None] * problem.n_rooms + population % problem.n_rooms
+    keys = (bucket * span + start)[placed]
+    ends = (bucket * span + end)[placed]
+    rows = np.broadcast_to(np.arange(n_schedules)[:, None], population.shape)[placed]
+    order = np.argsort(keys, kind="stable")
+    later = np.searchsorted(keys[order], ends[order], side="left") - np.arange(len(order)) - 1
+    return np.bincount(rows[order], weights=later, minlength=n_schedules).astype(np.int64)
+
+def count_conflicts(problem, population):
+    """Overlapping lecture pairs that share a mentor, mentee or room, per schedule."""
+    population = np.atleast_2d(population)
+    placed, start, end = _intervals(problem, population)
+    i, j = problem.pair_i, problem.pair_j
+    overlap = (start[:, i] < end[:, j]) & (start[:, j] < end[:, i]) & placed[:, i] & placed[:, j]
+    conflicts = overlap.sum(axis=1)
+    if problem.rooms:
+        conflicts += _room_clashes(problem, population, placed, start, end)
+    return conflicts
+
+def evaluate_fitness(problem, population):
+    """Fitness of every schedule in a (population, lectures) array.
+
+    Conflicts are counted per ordered pair of overlapping lectures that share
+    a mentor, mentee or room, as the pairwise loop did, and every lecture
+    that could not be placed adds UNPLACED_PENALTY.
+    """
+    population = np.atleast_2d(population)
+    unplaced = (population < 0).sum(axis=1)
+    # Lower conflicts mean higher fitness
+    return -(2 * count_conflicts(problem, population) + UNPLACED_PENALTY * unplaced)
+
+def mutate(problem, children, rng):
+    """Move one random lecture per child to a random placement that causes no new conflict."""
+    n_children = len(children)
+    rows = np.arange(n_children)
+    moved = rng.integers(len(problem.lectures), size=n_children)
+    placed, start, end = _intervals(problem, children)
+    placed[rows, moved] = False
+
+    # (child, slot, lecture): does lecture overlap the moved lecture if it starts at slot
+    candidate_start = problem.slot_start[None, :, None]
+    candidate_end = candidate_start + problem.length[moved][:, None, None]
+    overlap = (candidate_start < end[:, None, :]) & (start[:, None, :] < candidate_end) & placed[:, None, :]
+
+    # Neighbours sharing someone with the moved lecture block the whole slot,
+    # any other lecture only blocks its own room
+    people = (overlap & problem.shared[moved][:, None, :]).any(axis=2)
+    conflict = people[:, :, None] | ~problem.fits[moved][:, None, :]
+    if problem.rooms:
+        in_room = np.zeros((n_children, len(problem.lectures), problem.n_rooms), dtype=np.float32)
+        in_room[placed, (children % problem.n_rooms)[placed]] = 1
+        conflict |= np.matmul(overlap.astype(np.float32), in_room) > 0
+    conflict = conflict.reshape(n_children, -1)
+
+    priority = rng.random(conflict.shape)
+    priority[conflict] = np.inf
+    genes = priority.argmin(axis=1)
+    free = ~conflict[rows, genes]
+    children[free, moved[free]] = genes[free]
+    return children
+
+def crossover(parents1, parents2):
+    """Perform crossover by swapping the first half of the lectures between parents."""
+    children1, children2 = parents1.copy(), parents2.copy()
+    crossover_point = children1.shape[1] // 2
+    children1[:, :crossover_point] = parents2[:, :crossover_point]
+    children2[:, :crossover_point] = parents1[:, :crossover_point]
+    return children1, children2
+
+def initial_population(problem, population_size, rng):
+    return np.array([create_schedule(problem, rng) for _ in range(population_size)])
+
+def next_generation(problem, population, order, rng, population_size):
+    """Keep the better half (by `order`) and refill with mutated crossover children."""
+    parents = population[order[:max(population_size // 2, 1)]]
+
+    # Pairs of distinct parents, two children per pair
+    n_pairs = (population_size - len(parents) + 1) // 2
+    first = rng.integers(len(parents), size=n_pairs)
+    second = (first + rng.integers(1, max(len(parents), 2), size=n_pairs)) % len(parents)
+    children1, children2 = crossover(parents[first], parents[second])
+    children = mutate(problem, np.concatenate([children1, children2]), rng)
+    return np.concatenate([parents, children])
+
+def evolve(problem, generations=1000, population_size=20, rng=None, patience=None,
+           on_progress=None, should_stop=None):
+    """Run the genetic algorithm and return the best schedule and its fitness.
+
+    Stops early once a perfect schedule exists, when the best fitness has
+    not improved for `patience` generations, or when `should_stop()`
+    returns True. `on_progress(generation, best_fitness)` is called after
+    every generation.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    population = initial_population(problem, population_size, rng)
+    best_fitness, stale_generations = None, 0
+
+    for generation in range(generations):
+        fitness = evaluate_fitness(problem, population)
+        order = np.argsort(-fitness, kind="stable")
+        if best_fitness is None or fitness[order[0]] > best_fitness:
+            best_fitness, stale_generations = int(fitness[order[0]]), 0
+        else:
+            stale_generations += 1
+        if on_progress is not None:
+            on_progress(generation, best_fitness)
+        if best_fitness == 0 or (patience and stale_generations >= patience):
+            break
+        if should_stop is not None and should_stop():
+            break
+        population = next_generation(problem, population, order, rng, population_size)
+
+    fitness = evaluate_fitness(problem, population)
+    best = int(fitness.argmax())
+    return population[best], int(fitness[best])
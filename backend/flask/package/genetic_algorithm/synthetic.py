@@ -0,0 +1,36 @@
+import math
+import numpy as np
+from .scheduler import Lecture, Room
+
+DURATIONS = (30, 60, 75, 90, 120)
+CAPACITIES = (4, 8, 16, 30)
+
+
+def synthetic_lectures(n_lectures, n_mentors=None, n_mentees=None, mentees_per_lecture=3,
+                       durations=DURATIONS, seed=None, overlap=None):
+    """Random lecture set for benchmarks; smaller people pools mean more clashes.
+
+    `overlap` sets the pool sizes from a density instead: the average number
+    of lectures each mentor and each mentee attends.
+    """
+    rng = np.random.default_rng(seed)
+    if overlap:
+        n_mentors = n_mentors or math.ceil(n_lectures / overlap)
+        n_mentees = n_mentees or math.ceil(n_lectures * mentees_per_lecture / overlap)
+    n_mentors = n_mentors or max(n_lectures // 4, 1)
+    n_mentees = max(n_mentees or n_lectures, mentees_per_lecture)
+    lectures = []
+    for i in range(n_lectures):
+        mentees = rng.choice(n_mentees, size=mentees_per_lecture, replace=False)
+        lectures.append(Lecture(
+            f"Lecture {i}",
+            f"mentor{rng.integers(n_mentors)}",
+            [f"mentee{mentee}" for mentee in sorted(mentees.tolist())],
+            int(rng.choice(durations)),
+        ))
+    return lectures
+
+def synthetic_rooms(n_rooms, capacities=CAPACITIES, seed=None):
+    """Random rooms for benchmarks, sized from `capacities`."""
+    rng = np.random.default_rng(seed)
+    return [Room(f"Room {i}", int(rng.choice(capacities))) for i in range(n_rooms)]
@@ -0,0 +1,125 @@
+"""Internship listing parser benchmark and fixture check.
+
+Checks parse_internships() against the saved fixture and its expected
+records, then times it against the previous find_previous()-based parser
+on pages with more and more cards (the fixture's cards repeated). Run from
+backend/flask:
+    python -m package.internships.bench_parse
+    python -m package.internships.bench_parse --html saved_page.html --cards 50 500
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from bs4 import BeautifulSoup
+from .scrape import PARSER, parse_internships
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_HTML = os.path.join(FIXTURE_DIR, "internshala_listing.html")
+FIXTURE_EXPECTED = os.path.join(FIXTURE_DIR, "internshala_listing.json")
+CARD_PATTERN = re.compile(r'<div class="container-fluid individual_internship.*?(?=<div class="container-fluid '
+                          r'individual_internship|\n</div>\n</body>)', re.S)
+
+
+def legacy_parse(html):
+    """The parser before the single-pass rewrite: two find_previous() walks per card."""
+    soup = BeautifulSoup(html, "html.parser")
+    internship_details = []
+    for card in soup.find_all("div", class_="individual_internship_details"):
+        try:
+            title_tag = card.find_previous("a", class_="job-title-href")
+            title = title_tag.get_text(strip=True) if title_tag else "N/A"
+            link = "https://internshala.com" + title_tag["href"] if title_tag else "No link"
+            company_tag = card.find_previous("p", class_="company-name")
+            company = company_tag.get_text(strip=True) if company_tag else "N/A"
+            row_items = card.find("div", class_="detail-row-1").find_all("div", class_="row-1-item")
+            location = row_items[0].find("a").get_text(strip=True) if row_items[0].find("a") else "Online"
+            duration = row_items[1].find("span").get_text(strip=True) if len(row_items) > 1 else "N/A"
+            stipend = row_items[2].find("span").get_text(strip=True) if len(row_items) > 2 else "N/A"
+            posted_time_tag = card.find("div", class_="status-inactive")
+            posted_time = posted_time_tag.find("span").get_text(strip=True) if posted_time_tag else "N/A"
+            internship_details.append({"title": title, "company": company, "location": location,
+                                       "duration": duration, "stipend": stipend,
+                                       "posted_time": posted_time, "link": link})
+        except Exception:
+            continue
+    return internship_details
+
+
+def scaled_page(html, n_cards):
+    """The page with its cards repeated to n_cards."""
+    cards = CARD_PATTERN.findall(html)
+    if not cards:
+        raise ValueError("No cards found to repeat")
+    repeated = "".join(cards[i % len(cards)] for i in range(n_cards))
+    start, end = html.index(cards[0]), html.index(cards[-1]) + len(cards[-1])
+    return html[:start] + repeated + html[end:]
+
+
+def best_of(parse, html, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(html)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_fixture():
+    with open(FIXTURE_HTML, encoding="utf-8") as f:
+        html = f.read()
+    with open(FIXTURE_EXPECTED, encoding="utf-8") as f:
+        expected = json.load(f)
+    failures = []
+    for name, parse in [("legacy", legacy_parse), ("html.parser", lambda page: parse_internships(page, "html.parser")),
+                        (PARSER, parse_internships)]:
+        if parse(html) != expected:
+            failures.append(name)
+    return html, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--html", help="listing page to benchmark instead of the fixture")
+    parser.add_argument("--cards", type=int, nargs="+", default=[6, 60, 300, 1200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    html, failures = check_fixture()
+    if failures:
+        print(f"Fixture mismatch for: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"Fixture OK ({FIXTURE_HTML})")
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            html = f.read()
+
+    parsers = [("legacy (html.parser)", legacy_parse),
+               ("single pass (html.parser)", lambda page: parse_internships(page, "html.parser"))]
+    if PARSER != "html.parser":
+        parsers.append((f"single pass ({PARSER})", parse_internships))
+
+    results = []
+    print(f"{'parser':<28} {'cards':>6} {'seconds':>9} {'cards/s':>9}")
+    for n_cards in args.cards:
+        page = scaled_page(html, n_cards)
+        reference = legacy_parse(page)
+        for name, parse in parsers:
+            if parse(page) != reference:
+                print(f"{name} disagrees with the legacy parser at {n_cards} cards")
+                sys.exit(1)
+            seconds = best_of(parse, page, args.repeat)
+            results.append({"parser": name, "cards": len(reference), "seconds": round(seconds, 4),
+                            "cards_per_second": round(len(reference) / seconds)})
+            print(f"{name:<28} {len(reference):>6} {seconds:>9.4f} {len(reference) / seconds:>9.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Crawl several Internshala listing pages into the `internships` collection.
+
+Run from backend/flask, e.g. from cron:
+    python -m package.internships.crawl --pages 10
+"""
+import argparse
+import base64
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import requests
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne
+from .scrape import INTERNSHALA_URL, fetch_listing, parse_internships
+
+CRAWL_PAGES = int(os.getenv("INTERNSHIPS_CRAWL_PAGES", "5"))
+CRAWL_WORKERS = 4       # Listing pages fetched at once; keeps us polite to Internshala
+MAX_CRAWL_PAGES = 50
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+POSTED_PATTERN = re.compile(r"(\d+|a|an|few)\s+(hour|day|week|month)s?\s+ago", re.I)
+POSTED_UNIT_DAYS = {"hour": 1 / 24, "day": 1, "week": 7, "month": 30}
+STIPEND_PATTERN = re.compile(r"\d[\d,]*")
+
+
+def page_url(page):
+    return INTERNSHALA_URL if page == 1 else f"{INTERNSHALA_URL}page-{page}/"
+
+
+def posted_at(posted_time, crawled_at):
+    """Approximate posting time from Internshala's relative text, else the crawl time."""
+    text = (posted_time or "").strip().lower()
+    match = POSTED_PATTERN.search(text)
+    if match:
+        count = match.group(1)
+        count = 1 if count in ("a", "an", "few") else int(count)
+        return crawled_at - timedelta(days=count * POSTED_UNIT_DAYS[match.group(2).lower()])
+    return crawled_at
+
+
+def normalize(record, crawled_at):
+    """A parsed card as stored in Mongo: the scraped fields plus sortable ones."""
+    amounts = [int(amount.replace(",", "")) for amount in STIPEND_PATTERN.findall(record.get("stipend", ""))]
+    return {
+        **record,
+        "posted_at": posted_at(record.get("posted_time"), crawled_at),
+        "stipend_min": min(amounts) if amounts else None,
+        "crawled_at": crawled_at,
+    }
+
+
+def crawl(pages=CRAWL_PAGES, workers=CRAWL_WORKERS, fetch=fetch_listing, parse=parse_internships):
+    """Fetch and parse listing pages 1..pages concurrently.
+
+    Returns (records, errors): records deduplicated by link in page order,
+    errors as {page: message}.
+    """
+    crawled_at = datetime.now(timezone.utc)
+    session = requests.Session()  # One connection pool for every page
+
+    def fetch_page(page):
+        response = fetch(page_url(page), session=session)
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}")
+        return parse(response.text)
+
+    records, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, pages))) as pool:
+        futures = [(page, pool.submit(fetch_page, page)) for page in range(1, pages + 1)]
+        for page, future in futures:
+            try:
+                for record in future.result():
+                    if record["link"] != "No link":
+                        records.setdefault(record["link"], normalize(record, crawled_at))
+            except Exception as e:
+                errors[page] = str(e)
+    return list(records.values()), errors
+
+
+def ensure_indexes(collection):
+    collection.create_index("link", unique=True)
+    collection.create_index([("posted_at", DESCENDING), ("_id", DESCENDING)])
+    collection.create_index([("location", ASCENDING), ("posted_at", DESCENDING), ("_id", DESCENDING)])
+    collection.create_index([("title", TEXT), ("company", TEXT)], name="title_text")
+
+
+def save(collection, records):
+    """Upsert records keyed by link; returns (inserted, updated)."""
+    if not records:
+        return 0, 0
+    now = datetime.now(timezone.utc)
+    # posted_at is only set on insert, so re-crawls do not drift it with the crawl time
+    result = collection.bulk_write([
+        UpdateOne({"link": record["link"]},
+                  {"$set": {key: value for key, value in record.items() if key != "posted_at"},
+                   "$setOnInsert": {"posted_at": record["posted_at"], "first_seen_at": now}},
+                  upsert=True)
+        for record in records], ordered=False)
+    return result.upserted_count, result.modified_count
+
+
+def encode_cursor(document):
+    payload = json.dumps([document["posted_at"].isoformat(), str(document["_id"])])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """(posted_at, _id) from a cursor, raising ValueError on anything malformed."""
+    try:
+        posted, object_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(posted), ObjectId(object_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def search(collection, text=None, location=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Newest internships first, filtered, as (items, next_cursor).
+
+    Keyset pagination on (posted_at, _id): each page continues below the
+    last item of the previous one, so deep pages cost the same as the
+    first and inserts between requests do not shift results.
+    """
+    query = {}
+    if text:
+        query["$text"] = {"$search": text}
+    if location:
+        query["location"] = location
+    if cursor:
+        posted, object_id = decode_cursor(cursor)
+        query["$or"] = [{"posted_at": {"$lt": posted}},
+                        {"posted_at": posted, "_id": {"$lt": object_id}}]
+    documents = list(collection.find(query, {"crawled_at": 0})
+                     .sort([("posted_at", DESCENDING), ("_id", DESCENDING)])
+                     .limit(limit + 1))
+    next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+    items = []
+    for document in documents[:limit]:
+        items.append({**document, "_id": str(document["_id"]), "posted_at": document["posted_at"].isoformat(),
+                      "first_seen_at": document["first_seen_at"].isoformat()
+                      if document.get("first_seen_at") else None})
+    return items, next_cursor
+
+
+def main():
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=CRAWL_PAGES)
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+    args = parser.parse_args()
+
+    load_dotenv()
+    collection = MongoClient(os.getenv("MONGO_URL")).get_database()["internships"]
+    ensure_indexes(collection)
+    records, errors = crawl(min(args.pages, MAX_CRAWL_PAGES), args.workers)
+    inserted, updated = save(collection, records)
+    print(f"{len(records)} internships, {inserted} new, {updated} updated, page errors: {errors or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from .crawl import crawl, save
+from .scrape import fetch_listing, parse_internships
+
+REFRESH_SECONDS = int(os.getenv("INTERNSHIPS_REFRESH_SECONDS", "900"))   # Background refresh period
+MAX_STALE_SECONDS = int(os.getenv("INTERNSHIPS_MAX_STALE_SECONDS", "86400"))  # Older than this, revalidate inline
+MIN_REFRESH_SECONDS = 30  # Upstream is never asked more often than this, whatever the traffic
+MIN_CRAWL_SECONDS = int(os.getenv("INTERNSHIPS_MIN_CRAWL_SECONDS", "300"))  # Between multi-page crawls
+
+
+class Snapshot:
+    """One scraped listing, serialised once for every request that serves it."""
+
+    def __init__(self, data, upstream_etag=None, upstream_last_modified=None):
+        self.data = data
+        self.body = json.dumps({"status": "success", "data": data}).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.upstream_etag = upstream_etag
+        self.upstream_last_modified = upstream_last_modified
+        self.changed_at = time.time()
+        self.checked_at = self.changed_at
+
+    def age(self):
+        return time.time() - self.checked_at
+
+
+class InternshipFeed:
+    """Internshala listing kept in memory and renewed in the background.
+
+    A daemon thread revalidates the listing every `refresh_seconds` with a
+    conditional GET (If-None-Match / If-Modified-Since), so a 304 costs no
+    parsing. Requests are served from the snapshot. Past `refresh_seconds`
+    it is still served while a refresh runs in the background
+    (stale-while-revalidate); past `max_stale_seconds`, or before the first
+    scrape, the request waits for one. Refreshes are single flight and at
+    least MIN_REFRESH_SECONDS apart, so upstream load does not grow with
+    traffic, and a failed refresh keeps the last good snapshot.
+
+    Multi-page crawls into Mongo run on the same thread when requested,
+    one at a time and at least `min_crawl_seconds` apart.
+    """
+
+    def __init__(self, fetch=fetch_listing, parse=parse_internships,
+                 refresh_seconds=REFRESH_SECONDS, max_stale_seconds=MAX_STALE_SECONDS,
+                 min_refresh_seconds=MIN_REFRESH_SECONDS, min_crawl_seconds=MIN_CRAWL_SECONDS):
+        self.fetch = fetch
+        self.parse = parse
+        self.refresh_seconds = refresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self.snapshot = None
+        self.refresh_lock = threading.Lock()
+        self.last_attempt = 0.0
+        self.last_error = None
+        self.counts = {"fetched": 0, "not_modified": 0, "errors": 0, "served": 0, "served_stale": 0}
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.min_crawl_seconds = min_crawl_seconds
+        self.crawl_wakeup = threading.Condition()
+        self.crawl_request = None  # (pages, collection) waiting for the refresher thread
+        self.crawl_state = {"state": "idle"}
+        self.last_crawl = 0.0
+
+    def start(self):
+        """Start the background refresher once per process."""
+        with self.thread_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="internship-feed", daemon=True)
+                self.thread.start()
+
+    def _loop(self):
+        next_refresh = 0.0
+        while True:
+            if time.time() >= next_refresh:
+                self.refresh()
+                next_refresh = time.time() + self.refresh_seconds
+            with self.crawl_wakeup:
+                self.crawl_wakeup.wait_for(lambda: self.crawl_request is not None,
+                                           timeout=max(next_refresh - time.time(), 0))
+                request, self.crawl_request = self.crawl_request, None
+            if request is not None:
+                self._crawl(*request)
+
+    def request_crawl(self, pages, collection):
+        """Queue a crawl of `pages` listing pages into `collection` on the refresher thread.
+
+        Returns False, queueing nothing, if a crawl is queued or running or
+        the last one started less than `min_crawl_seconds` ago.
+        """
+        self.start()
+        with self.crawl_wakeup:
+            busy = self.crawl_request is not None or self.crawl_state["state"] == "running"
+            if busy or time.time() - self.last_crawl < self.min_crawl_seconds:
+                return False
+            self.crawl_request = (pages, collection)
+            self.crawl_state = {"state": "queued", "pages": pages}
+            self.crawl_wakeup.notify()
+        return True
+
+    def _crawl(self, pages, collection):
+        with self.crawl_wakeup:
+            self.last_crawl = time.time()
+            self.crawl_state = {"state": "running", "pages": pages, "started_at": self.last_crawl}
+        state = {"pages": pages, "started_at": self.last_crawl}
+        try:
+            records, errors = crawl(pages)
+            if not records and errors:
+                raise ValueError(f"Crawl failed: {errors}")
+            inserted, updated = save(collection, records)
+            state.update(state="done", internships=len(records), inserted=inserted, updated=updated, errors=errors)
+        except Exception as e:
+            state.update(state="failed", error=str(e))
+        state["finished_at"] = time.time()
+        with self.crawl_wakeup:
+            self.crawl_state = state
+
+    def refresh(self, wait=True):
+        """Revalidate the snapshot unless a refresh ran or is running recently.
+
+        With wait=False a refresh already in progress is left to finish.
+        Returns True if upstream was contacted.
+        """
+        if not self.refresh_lock.acquire(blocking=wait):
+            return False
+        try:
+            if time.time() - self.last_attempt < self.min_refresh_seconds:
+                return False
+            self.last_attempt = time.time()
+            snapshot = self.snapshot
+            try:
+                response = self.fetch(etag=snapshot and snapshot.upstream_etag,
+                                      last_modified=snapshot and snapshot.upstream_last_modified)
+                if response.status_code == 304 and snapshot is not None:
+                    snapshot.checked_at = time.time()
+                    self.counts["not_modified"] += 1
+                elif response.status_code == 200:
+                    data = self.parse(response.text)
+                    # An empty parse of a page that had listings is a layout change or a block page
+                    if not data and snapshot is not None and snapshot.data:
+                        raise ValueError("Listing page parsed to no internships")
+                    self.snapshot = Snapshot(data, response.headers.get("ETag"),
+                                             response.headers.get("Last-Modified"))
+                    self.counts["fetched"] += 1
+                else:
+                    raise ValueError(f"Internshala returned HTTP {response.status_code}")
+                self.last_error = None
+            except Exception as e:
+                self.counts["errors"] += 1
+                self.last_error = str(e)
+            return True
+        finally:
+            self.refresh_lock.release()
+
+    def get(self):
+        """Current snapshot; raises RuntimeError if nothing could ever be scraped."""
+        self.start()
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age() > self.max_stale_seconds:
+            self.refresh()
+            snapshot = self.snapshot
+            if snapshot is None:
+                raise RuntimeError(self.last_error or "Internships are not available yet")
+        elif snapshot.age() > self.refresh_seconds:
+            # Serve what we have and revalidate off the request thread
+            if not self.refresh_lock.locked() and time.time() - self.last_attempt >= self.min_refresh_seconds:
+                threading.Thread(target=self.refresh, args=(False,), daemon=True).start()
+            self.counts["served_stale"] += 1
+        self.counts["served"] += 1
+        return snapshot
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {**self.counts,
+                "internships": len(snapshot.data) if snapshot else 0,
+                "age_seconds": round(snapshot.age(), 1) if snapshot else None,
+                "refresh_seconds": self.refresh_seconds,
+                "last_error": self.last_error,
+                "crawl": dict(self.crawl_state)}
@@ -1,13 +1,76 @@
-from flask import Blueprint, jsonify
-from .scrape import scrape_internships 
+import hmac
+import os
+from flask import Blueprint, current_app, jsonify, request
+from .crawl import DEFAULT_PAGE_SIZE, MAX_CRAWL_PAGES, MAX_PAGE_SIZE, ensure_indexes, search
+from .feed import InternshipFeed
+
+# When set, POST /crawl needs "Authorization: Bearer <token>"
+CRAWL_TOKEN = os.getenv("INTERNSHIPS_CRAWL_TOKEN")
 
 # Create a Blueprint for internships
 internship_bp = Blueprint("internship", __name__)
 
+# Scraped in the background and served from memory; see InternshipFeed
+feed = InternshipFeed()
+indexes_ready = False
+
+def internships_collection():
+    # Indexes are created once per process, before the first query or crawl
+    global indexes_ready
+    collection = current_app.db["internships"]
+    if not indexes_ready:
+        ensure_indexes(collection)
+        indexes_ready = True
+    return collection
+
 @internship_bp.route("/", methods=["GET"])
 def get_internships():
     try:
-        internships = scrape_internships()
-        return jsonify({"status": "success", "data": internships}), 200
+        snapshot = feed.get()
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
+
+    # The body is serialised once per snapshot; clients revalidate with If-None-Match
+    response = current_app.response_class(snapshot.body, mimetype="application/json")
+    response.set_etag(snapshot.etag)
+    response.last_modified = snapshot.changed_at
+    response.cache_control.public = True
+    response.cache_control.max_age = max(int(feed.refresh_seconds - snapshot.age()), 0)
+    return response.make_conditional(request)
+
+@internship_bp.route("/search", methods=["GET"])
+def search_internships():
+    # Indexed query over crawled internships, newest first, with cursor pagination
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        items, next_cursor = search(internships_collection(),
+                                    text=request.args.get("q", "").strip() or None,
+                                    location=request.args.get("location", "").strip() or None,
+                                    cursor=request.args.get("cursor") or None,
+                                    limit=limit)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({"status": "success", "data": items, "next_cursor": next_cursor})
+
+@internship_bp.route("/crawl", methods=["POST"])
+def crawl_internships():
+    # Queued for the feed's background thread; cron can use `python -m package.internships.crawl`
+    if CRAWL_TOKEN and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {CRAWL_TOKEN}"):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    data = request.get_json(silent=True) or {}
+    try:
+        pages = min(max(int(data.get("pages", 5)), 1), MAX_CRAWL_PAGES)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "Invalid pages"}), 400
+    if not feed.request_crawl(pages, internships_collection()):
+        return jsonify({"status": "error", "message": "A crawl is running or ran recently",
+                        "crawl": feed.stats()["crawl"]}), 429
+    return jsonify({"status": "accepted", "crawl": feed.stats()["crawl"]}), 202
+
+@internship_bp.route("/crawl", methods=["GET"])
+def crawl_status():
+    return jsonify(feed.stats()["crawl"])
+
+@internship_bp.route("/stats", methods=["GET"])
+def feed_stats():
+    return jsonify(feed.stats())
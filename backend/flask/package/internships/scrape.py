@@ -1,31 +1,87 @@
 import requests
 from bs4 import BeautifulSoup
+try:
+    import lxml.html
+except ImportError:  # Optional: parsing falls back to BeautifulSoup's html.parser
+    lxml = None
+
+INTERNSHALA_URL = "https://internshala.com/internships/"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+REQUEST_TIMEOUT_SECONDS = 15
+PARSER = "lxml" if lxml is not None else "html.parser"
+# Everything a card needs, matched in a single traversal, in document order
+CARD_TAGS = ["a", "p", "div"]
+CARD_CLASSES = ["job-title-href", "company-name", "individual_internship_details"]
+
+
+def fetch_listing(url=INTERNSHALA_URL, etag=None, last_modified=None, session=requests):
+    """Conditional GET of a listing page; returns the response (304 when unchanged)."""
+    headers = dict(HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return session.get(url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
 
-def scrape_internships():
-    url = "https://internshala.com/internships/"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
 
-    response = requests.get(url, headers=headers)
+def scrape_internships():
+    response = fetch_listing()
 
     if response.status_code != 200:
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    return parse_internships(response.text)
+
+
+def parse_internships(html, backend=PARSER):
+    """Internship cards of a listing page, in page order, in one pass over the document.
+
+    One combined query yields titles, company names and detail blocks in
+    document order. Each detail block pairs with the latest title and company
+    before it, which is what find_previous() looked up per card by walking
+    back through the page. lxml builds the tree in C and is used when
+    installed; BeautifulSoup's html.parser is the fallback.
+    """
+    if backend == "lxml":
+        return _parse_with_lxml(html)
+    return _parse_with_soup(html)
+
 
-    # Find internship cards
-    internship_cards = soup.find_all("div", class_="individual_internship_details")
+def _card_record(title, link, company, location, duration, stipend, posted_time):
+    return {
+        "title": title,
+        "company": company,
+        "location": location,
+        "duration": duration,
+        "stipend": stipend,
+        "posted_time": posted_time,
+        "link": link
+    }
+
+
+def _parse_with_soup(html):
+    soup = BeautifulSoup(html, "html.parser")
 
     internship_details = []
+    title_tag = company_tag = None
 
-    for card in internship_cards:
+    for tag in soup.find_all(CARD_TAGS, class_=CARD_CLASSES):
+        classes = tag.get("class", [])
+        if tag.name == "a" and "job-title-href" in classes:
+            title_tag = tag
+            continue
+        if tag.name == "p" and "company-name" in classes:
+            company_tag = tag
+            continue
+        if tag.name != "div" or "individual_internship_details" not in classes:
+            continue
+
+        card = tag
         try:
-            title_tag = card.find_previous("a", class_="job-title-href")
             title = title_tag.get_text(strip=True) if title_tag else "N/A"
             link = "https://internshala.com" + title_tag["href"] if title_tag else "No link"
-
-            company_tag = card.find_previous("p", class_="company-name")
             company = company_tag.get_text(strip=True) if company_tag else "N/A"
 
             row_items = card.find("div", class_="detail-row-1").find_all("div", class_="row-1-item")
@@ -37,23 +93,76 @@ def scrape_internships():
             posted_time_tag = card.find("div", class_="status-inactive")
             posted_time = posted_time_tag.find("span").get_text(strip=True) if posted_time_tag else "N/A"
 
-            internship_data = {
-                "title": title,
-                "company": company,
-                "location": location,
-                "duration": duration,
-                "stipend": stipend,
-                "posted_time": posted_time,
-                "link": link
-            }
-
-            internship_details.append(internship_data)
+            internship_details.append(_card_record(title, link, company, location, duration, stipend, posted_time))
 
         except Exception:
             continue  # Skip the internship if any error occurs
 
     return internship_details
 
-# Call the function
-# internships = scrape_internships()
-# print(internships)
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml is not None:
+    # Compiled once; per-card lookups only search the card's own subtree
+    CARD_XPATH = lxml.html.etree.XPath(f"//a[{_has_class('job-title-href')}] | //p[{_has_class('company-name')}]"
+                                       f" | //div[{_has_class('individual_internship_details')}]")
+    DETAIL_ROW_XPATH = lxml.html.etree.XPath(f"(.//div[{_has_class('detail-row-1')}])[1]"
+                                             f"//div[{_has_class('row-1-item')}]")
+    HAS_DETAIL_ROW_XPATH = lxml.html.etree.XPath(f"boolean(.//div[{_has_class('detail-row-1')}])")
+    STATUS_XPATH = lxml.html.etree.XPath(f"(.//div[{_has_class('status-inactive')}])[1]")
+    LINK_XPATH = lxml.html.etree.XPath("(.//a)[1]")
+    SPAN_XPATH = lxml.html.etree.XPath("(.//span)[1]")
+    TEXT_XPATH = lxml.html.etree.XPath(".//text()")
+
+
+def _first(element, xpath):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def _text(element):
+    # Same as BeautifulSoup's get_text(strip=True): text nodes stripped and joined
+    return "".join(text.strip() for text in TEXT_XPATH(element))
+
+
+def _parse_with_lxml(html):
+    root = lxml.html.fromstring(html)
+
+    internship_details = []
+    title_tag = company_tag = None
+
+    for tag in CARD_XPATH(root):
+        if tag.tag == "a":
+            title_tag = tag
+            continue
+        if tag.tag == "p":
+            company_tag = tag
+            continue
+
+        card = tag
+        try:
+            title = _text(title_tag) if title_tag is not None else "N/A"
+            link = "https://internshala.com" + title_tag.attrib["href"] if title_tag is not None else "No link"
+            company = _text(company_tag) if company_tag is not None else "N/A"
+
+            if not HAS_DETAIL_ROW_XPATH(card):
+                continue
+            row_items = DETAIL_ROW_XPATH(card)
+
+            location_link = _first(row_items[0], LINK_XPATH)
+            location = _text(location_link) if location_link is not None else "Online"
+            duration = _text(_first(row_items[1], SPAN_XPATH)) if len(row_items) > 1 else "N/A"
+            stipend = _text(_first(row_items[2], SPAN_XPATH)) if len(row_items) > 2 else "N/A"
+
+            posted_time_tag = _first(card, STATUS_XPATH)
+            posted_time = _text(_first(posted_time_tag, SPAN_XPATH)) if posted_time_tag is not None else "N/A"
+
+            internship_details.append(_card_record(title, link, company, location, duration, stipend, posted_time))
+
+        except Exception:
+            continue  # Skip the internship if any error occurs
+
+    return internship_details
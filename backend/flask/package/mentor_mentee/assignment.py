@@ -0,0 +1,99 @@
+import math
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+HUNGARIAN_MAX_CELLS = 4_000_000  # students x mentor slots solved exactly
+CANDIDATES_PER_STUDENT = 20
+SIMILARITY_BLOCK_ROWS = 4096
+
+
+def mentor_capacities(mentors, n_students, default=None):
+    """Per-mentor caps from each mentor's `capacity` field, the default, or an even split.
+
+    Raises ValueError for a capacity that is not a non-negative integer.
+    """
+    if default is None:
+        default = math.ceil(n_students / max(len(mentors), 1))
+    try:
+        capacities = np.array([int(default if mentor.get("capacity") is None else mentor["capacity"])
+                               for mentor in mentors], dtype=np.int64)
+    except (TypeError, ValueError):
+        raise ValueError("Capacity must be an integer")
+    if (capacities < 0).any():
+        raise ValueError("Capacity must not be negative")
+    return capacities
+
+
+def candidate_mentors(student_matrix, mentor_matrix, k):
+    """Top-k mentors per student, scanning the similarity matrix in row blocks."""
+    k = min(k, mentor_matrix.shape[0])
+    candidates = np.empty((student_matrix.shape[0], k), dtype=np.int64)
+    scores = np.empty((student_matrix.shape[0], k), dtype=np.float32)
+    for start in range(0, student_matrix.shape[0], SIMILARITY_BLOCK_ROWS):
+        block = student_matrix[start:start + SIMILARITY_BLOCK_ROWS] @ mentor_matrix.T
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        candidates[start:start + len(block)] = top
+        scores[start:start + len(block)] = np.take_along_axis(block, top, axis=1)
+    return candidates, scores
+
+
+def assign_hungarian(student_matrix, mentor_matrix, capacities):
+    """Optimal assignment: each mentor is expanded into `capacity` slots."""
+    similarity = student_matrix @ mentor_matrix.T
+    slots = np.repeat(np.arange(mentor_matrix.shape[0]), capacities)
+    assignment = np.full(student_matrix.shape[0], -1, dtype=np.int64)
+    if len(slots):
+        students, slot_ids = linear_sum_assignment(similarity[:, slots], maximize=True)
+        assignment[students] = slots[slot_ids]
+    return assignment
+
+
+def assign_greedy(student_matrix, mentor_matrix, capacities, k=CANDIDATES_PER_STUDENT):
+    """Best-similarity-first assignment over each student's top-k mentors.
+
+    Students whose candidates all filled up fall back to their best mentor
+    that still has room.
+    """
+    n_students = student_matrix.shape[0]
+    assignment = np.full(n_students, -1, dtype=np.int64)
+    remaining = capacities.copy()
+    if n_students == 0 or mentor_matrix.shape[0] == 0:
+        return assignment
+
+    candidates, scores = candidate_mentors(student_matrix, mentor_matrix, k)
+    order = np.argsort(-scores, axis=None, kind="stable")
+    open_slots = int(remaining.sum())
+    for student, mentor in zip((order // candidates.shape[1]).tolist(), candidates.ravel()[order].tolist()):
+        if open_slots == 0:
+            break
+        if assignment[student] < 0 and remaining[mentor] > 0:
+            assignment[student] = mentor
+            remaining[mentor] -= 1
+            open_slots -= 1
+
+    for student in np.flatnonzero(assignment < 0):
+        if open_slots == 0:
+            break
+        similarity = mentor_matrix @ student_matrix[student]
+        similarity[remaining <= 0] = -np.inf
+        mentor = int(similarity.argmax())
+        assignment[student] = mentor
+        remaining[mentor] -= 1
+        open_slots -= 1
+    return assignment
+
+
+def assign_mentees(student_matrix, mentor_matrix, capacities, solver="auto"):
+    """Capacity-constrained mentee -> mentor assignment on normalized embeddings.
+
+    Returns the mentor index per student (-1 when no capacity was left) and
+    the solver that was used.
+    """
+    if solver == "auto":
+        cells = student_matrix.shape[0] * int(capacities.sum())
+        solver = "hungarian" if cells <= HUNGARIAN_MAX_CELLS else "greedy"
+    if solver == "hungarian":
+        return assign_hungarian(student_matrix, mentor_matrix, capacities), solver
+    if solver == "greedy":
+        return assign_greedy(student_matrix, mentor_matrix, capacities), solver
+    raise ValueError(f"Unknown solver: {solver}")
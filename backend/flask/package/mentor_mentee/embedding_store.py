@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+
+MENTOR_STORE_DIR = os.path.join("models", "mentor_embeddings")
+STUDENT_STORE_DIR = os.path.join("models", "student_embeddings")
+
+
+def skills_text(user):
+    """Comma separated skill names, the text that gets embedded for a user."""
+    return ", ".join(skill["name"] for skill in user.get("skills", []))
+
+
+def skills_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Normalized user skill embeddings kept in memory and persisted as a .npy file.
+
+    Rows are keyed by user id and the hash of the user's skills text, so a
+    sync only re-encodes users that are new or whose skills changed.
+    """
+
+    def __init__(self, model, directory=MENTOR_STORE_DIR):
+        self.model = model
+        self.directory = directory
+        self.matrix_path = os.path.join(directory, "embeddings.npy")
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.Lock()
+        # (ids, hashes, matrix) is swapped as a whole so readers never see a half update
+        self.state = ([], [], np.zeros((0, 0), dtype=np.float32))
+        self._load()
+
+    def _load(self):
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.index_path)):
+            return
+        with open(self.index_path) as f:
+            index = json.load(f)
+        matrix = np.load(self.matrix_path, mmap_mode="r")
+        if matrix.shape[0] == len(index["ids"]):
+            self.state = (index["ids"], index["hashes"], matrix)
+
+    def _save(self, ids, hashes, matrix):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_matrix = self.matrix_path + ".tmp.npy"
+        tmp_index = self.index_path + ".tmp"
+        np.save(tmp_matrix, matrix)
+        with open(tmp_index, "w") as f:
+            json.dump({"ids": ids, "hashes": hashes}, f)
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_index, self.index_path)
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+    def sync(self, users):
+        """Bring the store in line with the given user documents.
+
+        Returns the (ids, hashes, matrix) state covering exactly these users;
+        rank against it, as a concurrent sync may replace self.state.
+        """
+        current = {str(user["_id"]): skills_text(user) for user in users}
+        state = self.state
+        known = dict(zip(state[0], state[1]))
+        if known == {user_id: skills_hash(text) for user_id, text in current.items()}:
+            return state
+
+        with self.lock:
+            state = self.state
+            ids, hashes, matrix = state
+            rows = {user_id: (row, skill_hash) for row, (user_id, skill_hash) in enumerate(zip(ids, hashes))}
+            new_ids = list(current)
+            new_hashes = [skills_hash(current[user_id]) for user_id in new_ids]
+            stale = [i for i, user_id in enumerate(new_ids)
+                     if rows.get(user_id, (None, None))[1] != new_hashes[i]]
+            if not stale and len(new_ids) == len(ids):
+                return state
+
+            fresh = self.encode([current[new_ids[i]] for i in stale]) if stale else None
+            dim = fresh.shape[1] if fresh is not None else matrix.shape[1]
+            new_matrix = np.empty((len(new_ids), dim), dtype=np.float32)
+            stale_rows = set(stale)
+            kept = [i for i in range(len(new_ids)) if i not in stale_rows]
+            if kept:
+                new_matrix[kept] = matrix[[rows[new_ids[i]][0] for i in kept]]
+            if stale:
+                new_matrix[stale] = fresh
+
+            self._save(new_ids, new_hashes, new_matrix)
+            self.state = (new_ids, new_hashes, new_matrix)
+            return self.state
+
+    def rows(self, user_ids, state=None):
+        """Embedding matrix for the given (synced) user ids, in that order."""
+        ids, _, matrix = state or self.state
+        positions = {user_id: row for row, user_id in enumerate(ids)}
+        return np.asarray(matrix[[positions[str(user_id)] for user_id in user_ids]])
+
+    def top_k(self, query, k=None, state=None):
+        """Ids and cosine scores of the k users closest to a normalized query vector."""
+        ids, _, matrix = state or self.state
+        if not ids:
+            return [], np.zeros(0, dtype=np.float32)
+        scores = matrix @ np.asarray(query, dtype=np.float32)
+        k = len(ids) if k is None else min(k, len(ids))
+        if k < len(ids):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [ids[i] for i in top], scores[top]
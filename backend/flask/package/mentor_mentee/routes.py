@@ -1,78 +1,47 @@
 from flask import Blueprint, request, jsonify, current_app
+import time
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from bson.objectid import ObjectId
+from .embedding_store import EmbeddingStore, STUDENT_STORE_DIR, skills_text
+from .assignment import assign_mentees, mentor_capacities
 
 mentor_mentee = Blueprint("mentor_mentee", __name__)
 # Assuming you have model loaded already
 model = SentenceTransformer('all-MiniLM-L6-v2')
+# Mentor embeddings persist across requests; only changed mentors are re-encoded
+mentor_store = EmbeddingStore(model)
+student_store = EmbeddingStore(model, directory=STUDENT_STORE_DIR)
+
 @mentor_mentee.route("/", methods=["POST"])
 def get_score():
-    # collection_mentor = current_app.db['mentors']  # Replace with your collection name
     users = current_app.db['users']
     # Step 2: Fetch mentor data using mentor ObjectId
     user_id = request.get_json().get("user_id")
-    user = current_app.db["users"].find_one({'_id': ObjectId(user_id)})
-
-
-    # Query to find the mentor
-    mentors = list(users.find({"userType": "Mentor"}))
-    # print("Mentors are: ", mentors)
-    mentee = user
-    # print("Mentors are: ")
-    # for mentor in mentors:
-    #     print(mentor)
-    # Convert interests/expertise into embeddings
-    mentee_skills = ""
-    for skill in mentee["skills"]:
-        if mentee_skills != "":
-            mentee_skills += ", "
-        mentee_skills += skill["name"]
-    mentee_texts = [mentee_skills]
-    # print("Mentee text: ",mentee_texts)
-
+    top_k = request.get_json().get("top_k")
+    mentee = users.find_one({'_id': ObjectId(user_id)})
 
-    mentor_texts = []
-    for mentor in mentors:
-        # print(mentor["name"])
-        mentor_skills = ""
-        for skill in mentor["skills"]:
-            if mentor_skills != "":
-                mentor_skills += ", "
-            mentor_skills += skill["name"]
-        mentor_texts.append(mentor_skills)
-
-    # mentor_texts = [mentor['skills'] for mentor in mentors]
-    # print("Mentor text: ",mentor_texts)
-    mentee_embeddings = model.encode(mentee_texts)
-    mentor_embeddings = model.encode(mentor_texts)
-    # print("Mentee Embeddings:", mentee_embeddings)
-    # print("Mentor Embeddings:", mentor_embeddings)
+    # Query to find the mentors (only the fields we return or embed)
+    mentors = list(users.find({"userType": "Mentor"}, {"name": 1, "email": 1, "skills.name": 1}))
+    # Ranked against the synced snapshot: another request may sync a different mentor list meanwhile
+    mentor_state = mentor_store.sync(mentors)
 
-    # Compute similarity scores
-    similarity_matrix = cosine_similarity(mentee_embeddings, mentor_embeddings)
-    # print(similarity_matrix)
-    # Add similarity scores to the mentor objects
-    # print("Mentors are: ", len(mentors))
+    # Only the mentee's skills are encoded per request
+    mentee_embedding = mentor_store.encode([skills_text(mentee)])[0]
+    ranked_ids, scores = mentor_store.top_k(mentee_embedding, k=top_k, state=mentor_state)
 
-    i=0
-    filtered_mentors = []
-    for mentor in mentors:
-        filtered_mentor = {
-            "_id": str(mentor["_id"]),
+    mentors_by_id = {str(mentor["_id"]): mentor for mentor in mentors}
+    sorted_mentors = []
+    for mentor_id, score in zip(ranked_ids, scores):
+        mentor = mentors_by_id[mentor_id]
+        sorted_mentors.append({
+            "_id": mentor_id,
             "name": str(mentor["name"]),
             "email": str(mentor["email"]),
-            "skills": mentor_texts[i],
-            "similarity_score": float(similarity_matrix[0][i])
+            "skills": skills_text(mentor),
+            "similarity_score": float(score)
             # Add any other required fields here
-        }
-        filtered_mentors.append(filtered_mentor)
-        i+=1
-
-    # print("Filtered mentors are: ",filtered_mentors)
+        })
 
-    sorted_mentors = sorted(filtered_mentors, key=lambda x: x['similarity_score'], reverse=True)
-    # print(filtered_mentor)
     return jsonify(sorted_mentors)
 @mentor_mentee.route("/team", methods=["POST"])
 def get_score_from_team():
@@ -100,3 +69,53 @@ def get_score_from_team():
     
     # Return the JSON response
     return jsonify({"Mentees": mentees, "Mentors": mentors}), 200
+
+@mentor_mentee.route("/assign", methods=["POST"])
+def assign_all():
+    # Bulk mentee -> mentor assignment with per-mentor capacity
+    data = request.get_json() or {}
+    users = current_app.db['users']
+    fields = {"name": 1, "email": 1, "skills.name": 1}
+    timings = {}
+
+    start = time.perf_counter()
+    students = list(users.find({"userType": "Student"}, fields))
+    mentors = list(users.find({"userType": "Mentor"}, {**fields, "capacity": 1}))
+    timings["load_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    student_state = student_store.sync(students)
+    mentor_state = mentor_store.sync(mentors)
+    student_matrix = student_store.rows([student["_id"] for student in students], student_state)
+    mentor_matrix = mentor_store.rows([mentor["_id"] for mentor in mentors], mentor_state)
+    timings["embedding_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        capacities = mentor_capacities(mentors, len(students), default=data.get("capacity"))
+        assignment, solver = assign_mentees(student_matrix, mentor_matrix, capacities,
+                                            solver=data.get("solver", "auto"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    timings["solver_seconds"] = time.perf_counter() - start
+
+    assignments, unassigned = [], []
+    for student, mentor_index, student_vector in zip(students, assignment, student_matrix):
+        if mentor_index < 0:
+            unassigned.append(str(student["_id"]))
+            continue
+        mentor = mentors[mentor_index]
+        assignments.append({
+            "mentee_id": str(student["_id"]),
+            "mentee_name": str(student.get("name")),
+            "mentor_id": str(mentor["_id"]),
+            "mentor_name": str(mentor.get("name")),
+            "similarity_score": float(mentor_matrix[mentor_index] @ student_vector)
+        })
+
+    return jsonify({
+        "solver": solver,
+        "assignments": assignments,
+        "unassigned": unassigned,
+        "timings": timings
+    })
@@ -0,0 +1,129 @@
+"""Local stand-in for GitHub's repository search API, for development and tests.
+
+Serves GET /search/repositories with deterministic results per query, an
+ETag (answering 304 to a matching If-None-Match without using quota) and
+X-RateLimit-* headers over a fixed window; past the limit it answers 403
+like GitHub. Run from backend/flask and point the app at it:
+    python -m package.project_recommendation.fake_github --port 8765 --limit 10
+    GITHUB_API_URL=http://127.0.0.1:8765 flask run
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeGitHub:
+    """Rate-limit window and request counters shared by the handler threads."""
+
+    def __init__(self, limit=30, window=60.0, latency=0.0):
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.used = 0
+        self.requests = {"search": 0, "not_modified": 0, "rate_limited": 0}
+
+    def take(self):
+        """(allowed, remaining, reset) for one quota-counting request."""
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = int(self.window_start + self.window) + 1
+            if self.used >= self.limit:
+                self.requests["rate_limited"] += 1
+                return False, 0, reset
+            self.used += 1
+            return True, self.limit - self.used, reset
+
+    def count(self, kind):
+        with self.lock:
+            self.requests[kind] += 1
+
+
+def search_results(query, per_page):
+    seed = hashlib.sha256(query.encode("utf-8")).hexdigest()
+    slug = "-".join(query.lower().split()) or "repo"
+    return {"total_count": per_page, "incomplete_results": False, "items": [
+        {"full_name": f"user{i}/{slug}-{seed[:6]}", "html_url": f"https://github.com/user{i}/{slug}-{seed[:6]}",
+         "stargazers_count": 10000 - 7 * i - int(seed[:2], 16), "description": f"{query} project {i}",
+         "language": "Python", "topics": [slug]}
+        for i in range(per_page)]}
+
+
+def make_handler(github):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, body=None, headers=None):
+            data = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(code)
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                self._send(200, github.requests)
+                return
+            if url.path != "/search/repositories":
+                self._send(404, {"message": "Not Found"})
+                return
+            time.sleep(github.latency)
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0]
+            per_page = min(int(params.get("per_page", ["30"])[0]), 100)
+            body = search_results(query, per_page)
+            etag = '"' + hashlib.sha256(json.dumps(body).encode("utf-8")).hexdigest()[:32] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                github.count("not_modified")
+                self._send(304, headers={"ETag": etag})
+                return
+            allowed, remaining, reset = github.take()
+            rate_headers = {"X-RateLimit-Limit": github.limit, "X-RateLimit-Remaining": remaining,
+                            "X-RateLimit-Reset": reset}
+            if not allowed:
+                self._send(403, {"message": "API rate limit exceeded"}, rate_headers)
+                return
+            github.count("search")
+            self._send(200, body, {**rate_headers, "ETag": etag})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=0, limit=30, window=60.0, latency=0.0):
+    """Start a fake GitHub API in a background thread; returns (server, github, base_url)."""
+    github = FakeGitHub(limit, window, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(github))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, github, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--limit", type=int, default=30, help="searches allowed per window")
+    parser.add_argument("--window", type=float, default=60.0, help="rate-limit window in seconds")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per search response")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port),
+                                 make_handler(FakeGitHub(args.limit, args.window, args.latency)))
+    print(f"Fake GitHub API listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_SEARCH_CACHE_TTL", "3600"))
+SEARCH_CACHE_MAX_ENTRIES = 1024
+SEARCH_WORKERS = 4            # Keyword searches in flight at once
+MAX_RATE_WAIT_SECONDS = 10    # Longest a request waits for the rate limit to reset
+LOW_REMAINING = 3             # Below this many requests left, spread the rest until the reset
+REQUEST_TIMEOUT_SECONDS = 10
+# Repository fields kept in the cache; full search items are several KB each
+REPO_FIELDS = ("full_name", "html_url", "stargazers_count", "description", "language", "topics")
+
+
+class RateLimit:
+    """GitHub's X-RateLimit-* headers, shared by every request of a client.
+
+    With plenty left requests go straight through. When few are left they
+    are spaced evenly until the reset time, and when none are left callers
+    wait for the reset if it is close enough, or are refused. Conditional
+    requests are neither counted nor spaced while any are left: GitHub
+    answers an unchanged result with a 304 that is free, and the headers
+    of a 200 correct the count.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = 0.0
+        self.next_slot = 0.0
+        self.waited_seconds = 0.0
+
+    def update(self, headers):
+        remaining, reset = headers.get("X-RateLimit-Remaining"), headers.get("X-RateLimit-Reset")
+        with self.lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                self.remaining, self.reset_at = 0, time.time() + float(retry_after)
+
+    def delay(self, conditional=False):
+        """Seconds to wait before the next request, or None if it would be too long."""
+        with self.lock:
+            now = time.time()
+            if self.remaining is None or now >= self.reset_at:
+                return 0.0
+            if self.remaining <= 0:
+                wait = self.reset_at - now
+                return wait if wait <= MAX_RATE_WAIT_SECONDS else None
+            if conditional:
+                return 0.0
+            if self.remaining >= LOW_REMAINING:
+                # Counted down locally so concurrent requests see each other before the headers do
+                self.remaining -= 1
+                return 0.0
+            # Few left: hand out evenly spaced slots until the window resets
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + (self.reset_at - now) / self.remaining
+            self.remaining -= 1
+            wait = slot - now
+            return wait if wait <= MAX_RATE_WAIT_SECONDS else None
+
+    def wait(self, conditional=False):
+        """Block until a request may be sent; False if the limit is too far off."""
+        delay = self.delay(conditional)
+        if delay is None:
+            return False
+        if delay > 0:
+            with self.lock:
+                self.waited_seconds += delay
+            time.sleep(delay)
+        return True
+
+
+class GitHubSearch:
+    """Repository search with a pooled session, an ETag cache and rate limiting.
+
+    Results are cached per (keyword, sort, order, per_page) for
+    SEARCH_CACHE_TTL_SECONDS. An expired entry is revalidated with
+    If-None-Match; GitHub answers 304 without counting it against the
+    limit. When the limit is exhausted, a cached result of any age is
+    served rather than nothing.
+    """
+
+    def __init__(self, base_url=GITHUB_API_URL, token=None, ttl_seconds=SEARCH_CACHE_TTL_SECONDS,
+                 max_entries=SEARCH_CACHE_MAX_ENTRIES, workers=SEARCH_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.mount(self.base_url, HTTPAdapter(pool_maxsize=workers))
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        token = token if token is not None else os.getenv("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.workers = workers
+        self.rate_limit = RateLimit()
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # key -> (items, etag, fetched_at)
+        self.counts = {"hits": 0, "revalidated": 0, "fetched": 0, "stale_served": 0, "errors": 0}
+
+    def _count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def _cached(self, key):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+            return entry
+
+    def _store(self, key, items, etag):
+        with self.lock:
+            self.cache[key] = (items, etag, time.time())
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    def search(self, keyword, sort="stars", order="desc", per_page=8):
+        """Repository items for a keyword; [] if GitHub cannot be asked and nothing is cached."""
+        key = (keyword, sort, order, per_page)
+        entry = self._cached(key)
+        if entry is not None and time.time() - entry[2] < self.ttl_seconds:
+            self._count("hits")
+            return entry[0]
+
+        headers = {"If-None-Match": entry[1]} if entry and entry[1] else {}
+        # A second attempt only follows a rate-limit rejection whose reset is close
+        for _ in range(2):
+            if not self.rate_limit.wait(conditional=bool(headers)):
+                break
+            try:
+                response = self.session.get(f"{self.base_url}/search/repositories", headers=headers,
+                                            timeout=REQUEST_TIMEOUT_SECONDS,
+                                            params={"q": keyword, "sort": sort, "order": order, "per_page": per_page})
+            except requests.RequestException as e:
+                print(f"Error fetching data: {e}")
+                break
+            self.rate_limit.update(response.headers)
+
+            if response.status_code == 304 and entry is not None:
+                self._store(key, entry[0], entry[1])
+                self._count("revalidated")
+                return entry[0]
+            if response.status_code == 200:
+                items = [{field: item.get(field) for field in REPO_FIELDS}
+                         for item in response.json().get("items", [])]
+                self._store(key, items, response.headers.get("ETag"))
+                self._count("fetched")
+                return items
+            print(f"Error fetching data: {response.status_code}")
+            if response.status_code not in (403, 429) or self.rate_limit.remaining != 0:
+                break
+
+        self._count("stale_served" if entry else "errors")
+        return entry[0] if entry else []
+
+    def search_many(self, keywords, **options):
+        """search() for each keyword concurrently; results in keyword order."""
+        if not keywords:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(keywords))) as pool:
+            return list(pool.map(lambda keyword: self.search(keyword, **options), keywords))
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+            entries = len(self.cache)
+        return {**counts, "entries": entries, "rate_limit_remaining": self.rate_limit.remaining,
+                "rate_limit_reset_at": self.rate_limit.reset_at or None,
+                "rate_limit_waited_seconds": round(self.rate_limit.waited_seconds, 3)}
@@ -0,0 +1,112 @@
+"""GitHub projects and their READMEs in the `projects` collection, indexed by skill.
+
+Each repository is stored once, keyed by URL, with the list of skills it
+was found for; a multikey index on `skills` makes sampling for any skill
+set a single indexed query. The old per-skill-combination CSVs in
+package/project-data are the seed data. Import them (or other CSVs with
+domain, url, readme and stars columns) from backend/flask:
+    python -m package.project_recommendation.project_store
+    python -m package.project_recommendation.project_store saved/*.csv
+"""
+import argparse
+import glob
+import os
+from datetime import datetime, timezone
+import pandas as pd
+from pymongo import UpdateOne
+
+SEED_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "project-data")
+README_MAX_CHARS = 1000  # READMEs are prompts for the chat model, not shown in full
+SAMPLE_SIZE = 5
+README_ERROR = "Error fetching README"  # Prefix of what get_readme() returns when a fetch fails
+
+
+def ensure_indexes(collection):
+    collection.create_index("url", unique=True)
+    collection.create_index("skills")  # Multikey: one entry per skill of each project
+
+
+def save(collection, projects):
+    """Upsert projects keyed by URL; returns (inserted, updated).
+
+    Each project is a dict with url, stars, skill (or skills) and readme;
+    a project without a readme keeps the stored one. A repository found
+    again for another skill gains that skill instead of being stored twice.
+    """
+    merged = {}
+    for project in projects:
+        skills = project.get("skills") or [project["skill"]]
+        entry = merged.setdefault(project["url"], {"stars": int(project["stars"]), "skills": []})
+        if project.get("readme"):
+            entry["readme"] = project["readme"][:README_MAX_CHARS]
+        entry["skills"].extend(skill for skill in skills if skill not in entry["skills"])
+    if not merged:
+        return 0, 0
+    now = datetime.now(timezone.utc)
+    result = collection.bulk_write([
+        UpdateOne({"url": url},
+                  {"$set": {**{key: value for key, value in entry.items() if key != "skills"}, "updated_at": now},
+                   "$addToSet": {"skills": {"$each": entry["skills"]}}},
+                  upsert=True)
+        for url, entry in merged.items()], ordered=False)
+    return result.upserted_count, result.modified_count
+
+
+def sample(collection, skills, size=SAMPLE_SIZE):
+    """Up to `size` random projects matching any of the skills, in any order.
+
+    Each comes back with the readme and, as `domain`, the first of its
+    skills that the caller asked for.
+    """
+    wanted = list(dict.fromkeys(skills))
+    if not wanted:
+        return []
+    projects = collection.aggregate([
+        {"$match": {"skills": {"$in": wanted}}},
+        {"$sample": {"size": size}},
+        {"$project": {"_id": 0, "url": 1, "readme": 1, "stars": 1, "skills": 1}},
+    ])
+    return [{**project, "domain": next(skill for skill in wanted if skill in project["skills"])}
+            for project in projects]
+
+
+def read_csv_projects(paths):
+    """Projects from CSVs written by the old load_df(); one per row, skill from `domain`.
+
+    Rows whose readme is a fetch error are skipped, as load_df() does.
+    """
+    projects = []
+    for path in paths:
+        df = pd.read_csv(path, usecols=["domain", "url", "readme", "stars"]).dropna(subset=["url", "readme"])
+        df = df[~df["readme"].astype(str).str.startswith(README_ERROR)]
+        projects.extend({"skill": row.domain, "url": row.url, "readme": row.readme, "stars": row.stars}
+                        for row in df.itertuples(index=False))
+    return projects
+
+
+def seed_paths():
+    return sorted(glob.glob(os.path.join(SEED_DIR, "*.csv")))
+
+
+def import_csv(collection, paths=None):
+    """Load CSVs (the seed data by default) into the collection; returns (inserted, updated)."""
+    return save(collection, read_csv_projects(seed_paths() if paths is None else paths))
+
+
+def main():
+    from pymongo import MongoClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", nargs="*", help=f"CSV files to import (default: {SEED_DIR}/*.csv)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    collection = MongoClient(os.getenv("MONGO_URL")).get_database()["projects"]
+    ensure_indexes(collection)
+    inserted, updated = import_csv(collection, args.csv or None)
+    print(f"{inserted} projects added, {updated} updated, {collection.count_documents({})} in the store")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,33 +2,24 @@ from flask import Blueprint, request, jsonify, current_app
 project_recomm = Blueprint("project_recomm", __name__)
 from bson.objectid import ObjectId
 import requests
-import pandas as pd
 from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup  # Import BeautifulSoup for parsing HTML
 from .chatbot import chat
+from .github import GitHubSearch
+from .project_store import README_ERROR, ensure_indexes, import_csv, sample, save
+# Shared by all requests: pooled connections, cached searches, one view of the rate limit
+github = GitHubSearch()
+
+def to_projects(keyword, repos):
+    return [{
+        "stars": repo["stargazers_count"],
+        "url": repo["html_url"],
+        "domain": keyword
+    } for repo in repos]
+
 # Function to fetch GitHub repositories based on a topic/keyword
 def search_github_projects(keyword, sort='stars', order='desc', per_page=8):
-    url = "https://api.github.com/search/repositories"
-    params = {
-        "q": keyword,
-        "sort": sort,
-        "order": order,
-        "per_page": per_page
-    }
-    
-    response = requests.get(url, params=params)
-    if response.status_code == 200:
-        return [{
-            # "name": repo["name"],
-            # "owner": repo["owner"]["login"],
-            "stars": repo["stargazers_count"],
-            # "description": repo.get("description", "No description available"),
-            "url": repo["html_url"],
-            "domain": keyword
-        } for repo in response.json().get("items", [])]
-    else:
-        print(f"Error fetching data: {response.status_code}")
-        return []
+    return to_projects(keyword, github.search(keyword, sort=sort, order=order, per_page=per_page))
 
 # Function to fetch the README content asynchronously
 def fetch_readme_content(repo_url):
@@ -41,56 +32,47 @@ def fetch_readme_content(repo_url):
             readme_text = soup.get_text()  # Extract text from the HTML
             return readme_text.strip()  # Remove leading/trailing whitespace
         else:
-            return 'Error fetching README'
+            return README_ERROR
     except Exception as e:
-        return f'Error fetching README: {e}'
+        return f'{README_ERROR}: {e}'
 
 # Function to recommend projects based on multiple keywords
 def recommend_projects(keywords, per_page=5):
+    # One search per keyword, run concurrently and served from cache when fresh
     all_recommendations = []
-    for keyword in keywords:
-        print(f"Searching for projects related to: {keyword}")
-        all_recommendations.extend(search_github_projects(keyword, per_page=per_page))
+    for keyword, repos in zip(keywords, github.search_many(keywords, per_page=per_page)):
+        all_recommendations.extend(to_projects(keyword, repos))
     return all_recommendations
 
-def truncate_string_column(df, column_name, max_length=1000):
-    df[column_name] = df[column_name].str.slice(0, max_length)
-    return df
-
+indexes_ready = False
 
+def projects_collection():
+    # Indexes are created once per process; an empty store is filled from the seed CSVs
+    global indexes_ready
+    collection = current_app.db["projects"]
+    if not indexes_ready:
+        ensure_indexes(collection)
+        if collection.estimated_document_count() == 0:
+            import_csv(collection)
+        indexes_ready = True
+    return collection
 
 @project_recomm.route("/", methods=["POST"])
 def get_projects():
     # Extracting the keywords
     user_id = request.get_json().get("user_id")
     user = current_app.db["users"].find_one({'_id': ObjectId(user_id)})
-    # print(user["skills"])
-    keywords = user["skills"]#request.get_json().get("keywords")
-    fp = ""
-    for skill in keywords:
-        print(skill)
-        fp += skill["name"]
-    df = pd.read_csv(f"package/project-data/{fp}.csv")
-    # print("File path: ", fp)
-    # Sample 5 random rows from the dataframe
-    sampled_rows = df.sample(n= min(5, len(df)))  # Get 5 random rows from the DataFrame
+    keywords = [skill["name"] for skill in user["skills"]]
+    # Sample 5 random projects for any of the user's skills, whatever their order
+    sampled_rows = sample(projects_collection(), keywords)
+    if not sampled_rows:
+        return jsonify({"error": "No projects stored for these skills yet"}), 404
 
     # Function to get the project idea (accepting a positional index argument)
     def fetch_project_idea(positional_index):
-        # Get the 'readme' and 'domain' from the row
-        readme = sampled_rows.iloc[positional_index]["readme"]
-        domain = sampled_rows.iloc[positional_index]["domain"]  # Extract the domain for the current row
-        
-        # Parse the domain string to a Python dictionary
-        domain = domain.replace("'", '"')  # Ensure the string is valid JSON (replace single quotes with double quotes)
-        domain = domain.replace('ObjectId', '')  # Remove ObjectId
-        domain = domain.replace('(', '').replace(')', '')  # Clean up any remaining parentheses
-        
-        # Safely evaluate the string into a Python dictionary
-        # domain_dict = ast.literal_eval(domain)
-        # print("Dmain is",domain)
-        # Extract only the 'name' from the domain, assuming 'name' holds the title you need
-        # domain_title = domain_dict.get('name', None)
+        # Get the 'readme' and 'domain' (the matched skill) of the project
+        readme = sampled_rows[positional_index]["readme"]
+        domain = sampled_rows[positional_index]["domain"]
 
         # Fetch response from the chat function
         response = chat(readme)
@@ -100,7 +82,7 @@ def get_projects():
             "title": response["title"],
             "description": response["description"],
             "key_features": response["key_features"],
-            "domain": domain  # Include only the 'name' from the domain
+            "domain": domain
         }
 
     # Using ThreadPoolExecutor to fetch 5 responses in parallel
@@ -118,36 +100,30 @@ def load_df():
     # Example usage
     user_id = request.get_json().get("user_id")
     user = current_app.db["users"].find_one({'_id': ObjectId(user_id)})
-    keywords = user["skills"]#request.get_json().get("keywords")
-    # keywords = ['Web Development', 'Machine Learning', 'AI', 'Data Science']
-    fp =""
-    new_keywords = []
-    for skill in keywords:
-        fp += skill["name"]
-        new_keywords.append(skill["name"])
+    new_keywords = [skill["name"] for skill in user["skills"]]
     print("New Skills are: ",new_keywords)
     
     # Get recommendations
-    p = 10 if len(keywords) < 3 else 5
+    p = 10 if len(new_keywords) < 3 else 5
     recommended_projects = recommend_projects(new_keywords, per_page=p)
 
-    # Prepare DataFrame with parallel fetching of README files
-    # columns = ['name', 'domain', 'owner', 'stars', 'description', 'url', 'readme']
-    columns = ['domain',  'url', 'readme', 'stars']
-    df = pd.DataFrame(columns=columns)
+    # READMEs are fetched only for repos not in the store yet; stored ones just gain the skill
+    collection = projects_collection()
+    urls = list(dict.fromkeys(project["url"] for project in recommended_projects))
+    known = {project["url"] for project in collection.find({"url": {"$in": urls}}, {"url": 1})}
+    to_fetch = [url for url in urls if url not in known]
 
     # Use ThreadPoolExecutor for parallelizing the README fetching
     with ThreadPoolExecutor(max_workers=5) as executor:
-        readme_contents = list(executor.map(fetch_readme_content, [project['url'] for project in recommended_projects]))
-
-    # Populate the DataFrame
-    df['readme'] = readme_contents
-    for i, project in enumerate(recommended_projects):
-        df.loc[i] = {**project, 'readme': readme_contents[i]}
-
-    # Display the DataFrame
-    print("\nDataFrame with README content:")
-    df = df[df["readme"]!="Error fetching README"]
-    df = truncate_string_column(df, 'readme')
-    df.to_csv(f"package/project-data/{fp}.csv")
-    return jsonify("File Successfully saved"), 200
\ No newline at end of file
+        readmes = dict(zip(to_fetch, executor.map(fetch_readme_content, to_fetch)))
+
+    projects = [{"skill": project["domain"], "url": project["url"], "stars": project["stars"],
+                 "readme": readmes.get(project["url"])}
+                for project in recommended_projects
+                if project["url"] in known or not readmes[project["url"]].startswith(README_ERROR)]
+    inserted, updated = save(collection, projects)
+    return jsonify(f"{inserted} projects added, {updated} updated"), 200
+
+@project_recomm.route("/github-stats", methods=["GET"])
+def github_stats():
+    return jsonify(github.stats())
@@ -1,10 +1,9 @@
 import os
 import pickle
 from flask import Blueprint, request, jsonify
-from sklearn.preprocessing import MinMaxScaler
-from collections import defaultdict
-import itertools
+import numpy as np
 import pandas as pd
+from .skill_index import SkillIndex
 
 recommend_bp = Blueprint('recommend_bp', __name__)
 
@@ -20,6 +19,93 @@ recommender_data = load_recommender()
 df = recommender_data['df']
 vectorizer = recommender_data['vectorizer']
 knn_model = recommender_data['knn']
+skill_index = SkillIndex(df['skills'].tolist())
+
+# === Precomputed catalog data for array-based ranking ===
+OUTPUT_FIELDS = [
+    'course_title',
+    'description',
+    'skills',
+    'level',
+    'rating',
+    'num_reviews',
+    'duration_hours'
+]
+course_records = df[OUTPUT_FIELDS].to_dict(orient='records')
+title_codes, _ = pd.factorize(df['course_title'])
+_codes, _counts = np.unique(title_codes, return_counts=True)
+duplicate_title_groups = [np.flatnonzero(title_codes == code) for code in _codes[_counts > 1]]
+
+MAX_BATCH_SIZE = 10000
+MAX_TOP_K = 50  # Larger requests are clamped to this many courses per learner
+RANK_CHUNK_SIZE = 256  # Learners ranked per dense (learners x catalog) block
+
+
+def min_max(values, mask):
+    """Row-wise min-max scaling over the masked entries (constant rows map to 0)."""
+    low = np.where(mask, values, np.inf).min(axis=1, keepdims=True)
+    high = np.where(mask, values, -np.inf).max(axis=1, keepdims=True)
+    span = high - low
+    span[span == 0] = 1
+    return (values - low) / span
+
+
+def hybrid_rank(distances, indices, complementary_score, top_k):
+    """Rank KNN + complementary candidates for a block of learners at once."""
+    n_users, n_courses = complementary_score.shape
+    rows = np.arange(n_users)[:, None]
+
+    is_knn = np.zeros((n_users, n_courses), dtype=bool)
+    is_knn[rows, indices] = True
+    candidate = is_knn | (complementary_score > 0)
+
+    # Non-KNN candidates have no distance; treat it as 1 like the fillna(1) before
+    distance = np.ones((n_users, n_courses))
+    distance[rows, indices] = distances
+
+    # Keep one course per title: KNN hits in neighbour order, then catalog order
+    if duplicate_title_groups:
+        priority = np.tile(np.arange(n_courses, dtype=float) + indices.shape[1], (n_users, 1))
+        priority[rows, indices] = np.arange(indices.shape[1])
+        for group in duplicate_title_groups:
+            group_priority = np.where(candidate[:, group], priority[:, group], np.inf)
+            first = group[group_priority.argmin(axis=1)]
+            in_group = candidate[:, group]
+            candidate[:, group] = False
+            candidate[np.arange(n_users), first] = in_group.any(axis=1)
+
+    rank_score = (0.7 * (1 - min_max(distance, candidate))) + (0.3 * min_max(complementary_score, candidate))
+    rank_score[~candidate] = -np.inf
+
+    top_k = min(top_k, n_courses)
+    top = np.argpartition(-rank_score, top_k - 1, axis=1)[:, :top_k]
+    top_scores = np.take_along_axis(rank_score, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [row[np.isfinite(scores)] for row, scores in zip(top, top_scores)]
+
+
+def rank_courses(skill_sets, top_k=5):
+    """Top-k course recommendations for every skill set in one vectorized pass."""
+    # === Vectorize User Skills & KNN (one call for the whole batch) ===
+    user_vectors = vectorizer.transform([' '.join(skills) for skills in skill_sets])
+    distances, indices = knn_model.kneighbors(user_vectors)
+    user_matrix = skill_index.user_matrix(skill_sets)
+
+    ranked = []
+    for start in range(0, len(skill_sets), RANK_CHUNK_SIZE):
+        stop = start + RANK_CHUNK_SIZE
+
+        # === Complementary Skills (precomputed co-occurrence index) ===
+        skills_to_learn = skill_index.complementary_skills(user_matrix[start:stop], top_n=10)
+        complementary_score = skill_index.complementary_scores(skills_to_learn)
+
+        # === Combine & Rank ===
+        for top in hybrid_rank(distances[start:stop], indices[start:stop], complementary_score, top_k):
+            ranked.append([course_records[i] for i in top])
+    return ranked
+
 
 @recommend_bp.route('/recommend', methods=['POST'])
 def recommend_courses():
@@ -29,62 +115,31 @@ def recommend_courses():
     if not user_skills:
         return jsonify({"error": "No skills provided"}), 400
 
-    # === Vectorize User Skills ===
-    user_skills_str = ' '.join(user_skills)
-    user_vector = vectorizer.transform([user_skills_str])
-
-    # === KNN Recommendations ===
-    distances, indices = knn_model.kneighbors(user_vector)
-    knn_recommendations = df.iloc[indices[0]].copy()
-    knn_recommendations['source'] = 'KNN'
-    knn_recommendations['distance'] = distances.flatten()  # Store distances
-
-    # === Co-occurrence Analysis ===
-    co_occur = defaultdict(lambda: defaultdict(int))
-    for skills in df['skills']:
-        for a, b in itertools.combinations(skills, 2):  # Fixed with combinations
-            co_occur[a][b] += 1
-            co_occur[b][a] += 1  # Ensure bidirectional counting
-
-    # Find complementary skills
-    skill_boost = defaultdict(int)
-    for skill in user_skills:
-        for related_skill, count in co_occur[skill].items():
-            if related_skill not in user_skills:
-                skill_boost[related_skill] += count
-
-    # Get top complementary skills to learn
-    top_skills_to_learn = [s for s, _ in sorted(skill_boost.items(),
-                          key=lambda x: -x[1])[:10]]
-
-    # === Complementary Courses ===
-    df['complementary_score'] = df['skills'].apply(
-        lambda x: sum(s in top_skills_to_learn for s in x)
-    )
-    complementary_courses = df[df['complementary_score'] > 0].copy()
-    complementary_courses['source'] = 'Complementary'
-
-    # === Combine & Rank ===
-    combined = pd.concat([knn_recommendations, complementary_courses])
-    combined = combined.drop_duplicates(subset=['course_title'], keep='first')
-
-    # Create hybrid ranking score
-    scaler = MinMaxScaler()
-    combined['distance_norm'] = 1 - scaler.fit_transform(combined[['distance']].fillna(1))
-    combined['comp_score_norm'] = scaler.fit_transform(combined[['complementary_score']])
-
-    combined['rank_score'] = (0.7 * combined['distance_norm']) + (0.3 * combined['comp_score_norm'])
-    combined = combined.sort_values(by='rank_score', ascending=False)
-
-    # === Final Output Fields ===
-    result = combined.head(5)[[  # Limit the number of recommendations
-        'course_title',
-        'description',
-        'skills',
-        'level',
-        'rating',
-        'num_reviews',
-        'duration_hours'
-    ]]
-    return jsonify(result.to_dict(orient='records'))
-    
\ No newline at end of file
+    return jsonify(rank_courses([user_skills], top_k=5)[0])
+
+
+@recommend_bp.route('/recommend/batch', methods=['POST'])
+def recommend_courses_batch():
+    data = request.get_json()
+    learners = data.get("learners", [])
+
+    if not learners:
+        return jsonify({"error": "No learners provided"}), 400
+    if len(learners) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} learners per batch"}), 400
+    try:
+        top_k = int(data.get("top_k", 5))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_k must be an integer"}), 400
+    if top_k < 1:
+        return jsonify({"error": "top_k must be positive"}), 400
+    top_k = min(top_k, MAX_TOP_K)
+
+    skill_sets = [set(learner.get("skills", [])) for learner in learners]
+    valid = [i for i, skills in enumerate(skill_sets) if skills]
+    ranked = rank_courses([skill_sets[i] for i in valid], top_k=top_k) if valid else []
+
+    results = [{"id": learner.get("id"), "error": "No skills provided"} for learner in learners]
+    for i, recommendations in zip(valid, ranked):
+        results[i] = {"id": learners[i].get("id"), "recommendations": recommendations}
+    return jsonify({"results": results})
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy import sparse
+
+
+class SkillIndex:
+    """Sparse skill co-occurrence data built once from the course catalog."""
+
+    def __init__(self, skills_column):
+        # Vocabulary of every skill that appears in the catalog
+        self.skills = sorted({skill for skills in skills_column for skill in skills})
+        self.skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+
+        # Course x skill count matrix (duplicate entries in a course's list add up,
+        # matching the pairwise counting of itertools.combinations)
+        rows = [course_id for course_id, skills in enumerate(skills_column) for _ in skills]
+        cols = [self.skill_ids[skill] for skills in skills_column for skill in skills]
+        course_skills = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(skills_column), len(self.skills))
+        )
+        course_skills.sum_duplicates()
+
+        # Skill -> course inverted index
+        self.skill_courses = course_skills.T.tocsr()
+
+        # Skill x skill co-occurrence counts, without self pairs
+        co_occur = (self.skill_courses @ course_skills).tolil()
+        co_occur.setdiag(0)
+        self.co_occur = co_occur.tocsr()
+        self.co_occur.eliminate_zeros()
+
+    def user_matrix(self, skill_sets):
+        """One binary row per learner over the known skill vocabulary."""
+        rows, cols = [], []
+        for row, skills in enumerate(skill_sets):
+            for skill in skills:
+                skill_id = self.skill_ids.get(skill)
+                if skill_id is not None:
+                    rows.append(row)
+                    cols.append(skill_id)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(skill_sets), len(self.skills))
+        )
+
+    def complementary_skills(self, users, top_n=10):
+        """Top co-occurring skills each learner does not have yet, as a binary matrix."""
+        boost = (users @ self.co_occur).toarray()
+        boost[users.nonzero()] = 0
+
+        top_n = min(top_n, boost.shape[1])
+        if top_n == 0:
+            return sparse.csr_matrix(boost.shape, dtype=np.int32)
+        # Break ties on skill order so results do not depend on set iteration order
+        n_skills = boost.shape[1]
+        key = boost.astype(np.int64) * n_skills + np.arange(n_skills - 1, -1, -1)
+        top = np.argpartition(-key, top_n - 1, axis=1)[:, :top_n]
+        rows = np.repeat(np.arange(boost.shape[0]), top_n)
+        cols = top.ravel()
+        keep = boost[rows, cols] > 0
+        return sparse.csr_matrix(
+            (np.ones(int(keep.sum()), dtype=np.int32), (rows[keep], cols[keep])),
+            shape=boost.shape
+        )
+
+    def complementary_scores(self, skills_to_learn):
+        """Number of the given skills each course teaches, one row per learner."""
+        return (skills_to_learn @ self.skill_courses).toarray()
+
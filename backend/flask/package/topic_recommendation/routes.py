@@ -1,13 +1,19 @@
 from flask import Blueprint, request, jsonify, current_app
-import joblib
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.tree import DecisionTreeClassifier
+import threading
+import numpy as np
+from .transition_table import TopicTransitionTable
 topic_recomm = Blueprint("topic_recomm", __name__)
-clf = joblib.load("models/decision_tree_model_topic_recomm.pkl")
-le_subject = joblib.load('models/label_encoder_subject.pkl')
-le_current = joblib.load('models/label_encoder_current.pkl')
-le_next = joblib.load('models/label_encoder_next.pkl')
+transition_table = TopicTransitionTable.load()
+_reload_lock = threading.Lock()
+
+def get_transition_table(force=False):
+    """Return the transition table, rebuilding it if the .pkl files changed."""
+    global transition_table
+    if force or transition_table.is_stale():
+        with _reload_lock:
+            if force or transition_table.is_stale():
+                transition_table = TopicTransitionTable.load()
+    return transition_table
 
 def remove_trailing_duplicates(lst):
     if not lst:
@@ -28,22 +34,47 @@ def get_topic():
     current_topic = data.get("current_topic")
     if not current_topic or not sub:
         return jsonify("Current topic or subject cannot be None"), 400
-    
-    suggested_topics = []
-    example = pd.DataFrame([[le_subject.transform([sub])[0], 
-                        le_current.transform([current_topic])[0], 
-                        75]],
-                    columns=['subject_encoded', 'current_encoded', 'score'])
-    c=0
-    while c<10:
-        pred = clf.predict(example)
-        pred_topic = le_next.inverse_transform(pred)[0]
-        suggested_topics.append(pred_topic)
-        # print(pred, suggested_topics)
-        example = pd.DataFrame([[le_subject.transform([sub])[0], 
-                    pred[0], 
-                    75]],
-                columns=['subject_encoded', 'current_encoded', 'score'])
-        c+=1
+
+    table = get_transition_table()
+    suggested_topics = table.topic_names(table.chain_codes(sub, current_topic))
     result = remove_trailing_duplicates(suggested_topics)
-    return jsonify({"response": result})
\ No newline at end of file
+    return jsonify({"response": result})
+
+
+@topic_recomm.route("/reload", methods=["POST"])
+def reload_table():
+    table = get_transition_table(force=True)
+    return jsonify({"subjects": table.table.shape[0], "topics": table.table.shape[1]})
+
+
+@topic_recomm.route("/verify", methods=["GET"])
+def verify_table():
+    # Check the precomputed table against the live decision tree
+    sample = request.args.get("sample", default=0, type=int)
+    report = get_transition_table().verify(sample=sample)
+    return jsonify(report), 200 if not report["mismatches"] else 500
+
+
+@topic_recomm.route("/batch", methods=["POST"])
+def get_topics_batch():
+    # Next-topic paths for many (subject, current_topic) pairs at once
+    data = request.get_json()
+    items = data.get("items", [])
+    if data.get("subject") and data.get("topics"):
+        items = [{"subject": data["subject"], "current_topic": topic} for topic in data["topics"]]
+    if not items:
+        return jsonify("No (subject, current_topic) pairs provided"), 400
+
+    table = get_transition_table()
+    subjects = [item.get("subject") for item in items]
+    topics = [item.get("current_topic") for item in items]
+    subject_codes, topic_codes, known = table.encode(subjects, topics)
+    paths, lengths = table.batch_chain_codes(subject_codes[known], topic_codes[known],
+                                             live=data.get("mode") == "tree")
+
+    results = [{"subject": sub, "current_topic": topic, "error": "Unknown subject or current topic"}
+               for sub, topic in zip(subjects, topics)]
+    for i, path, length in zip(np.flatnonzero(known), paths, lengths):
+        results[i] = {"subject": subjects[i], "current_topic": topics[i],
+                      "response": table.topic_names(path[:length])}
+    return jsonify({"results": results})
@@ -0,0 +1,138 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+
+MODEL_PATHS = {
+    "clf": "models/decision_tree_model_topic_recomm.pkl",
+    "le_subject": "models/label_encoder_subject.pkl",
+    "le_current": "models/label_encoder_current.pkl",
+    "le_next": "models/label_encoder_next.pkl",
+}
+FEATURES = ['subject_encoded', 'current_encoded', 'score']
+FIXED_SCORE = 75
+CHAIN_LENGTH = 10
+
+
+def model_signature():
+    """Modification times of the model files, used to detect a retrained model."""
+    return tuple(os.stat(path).st_mtime_ns for path in MODEL_PATHS.values())
+
+
+class TopicTransitionTable:
+    """Decision tree evaluated up front for every (subject, current topic) pair.
+
+    table[subject_code, topic_code] holds the le_next code the tree predicts
+    with the score fixed at FIXED_SCORE. Predicted codes are fed back in as
+    the next current topic, so the topic axis covers both encoders.
+    """
+
+    def __init__(self, clf, le_subject, le_current, le_next, signature=None):
+        self.clf = clf
+        self.le_subject = le_subject
+        self.le_current = le_current
+        self.le_next = le_next
+        self.signature = signature
+
+        n_subjects = len(le_subject.classes_)
+        n_topics = max(len(le_current.classes_), len(le_next.classes_))
+        subjects, topics = np.meshgrid(np.arange(n_subjects), np.arange(n_topics), indexing='ij')
+        grid = pd.DataFrame({
+            'subject_encoded': subjects.ravel(),
+            'current_encoded': topics.ravel(),
+            'score': FIXED_SCORE,
+        }, columns=FEATURES)
+        self.table = clf.predict(grid).astype(np.intp).reshape(n_subjects, n_topics)
+
+    @classmethod
+    def load(cls):
+        signature = model_signature()
+        models = {name: joblib.load(path) for name, path in MODEL_PATHS.items()}
+        return cls(signature=signature, **models)
+
+    def is_stale(self):
+        return model_signature() != self.signature
+
+    def chain_codes(self, subject, current_topic, steps=CHAIN_LENGTH):
+        """Next-topic codes for `steps` predictions, using only table lookups."""
+        row = self.table[self.le_subject.transform([subject])[0]]
+        code = self.le_current.transform([current_topic])[0]
+        codes = []
+        for _ in range(steps):
+            code = row[code]
+            codes.append(code)
+        return codes
+
+    def table_step(self, subject_codes, topic_codes):
+        return self.table[subject_codes, topic_codes]
+
+    def tree_step(self, subject_codes, topic_codes):
+        """One decision-tree predict over an N-row feature matrix."""
+        features = pd.DataFrame({
+            'subject_encoded': subject_codes,
+            'current_encoded': topic_codes,
+            'score': FIXED_SCORE,
+        }, columns=FEATURES)
+        return self.clf.predict(features).astype(np.intp)
+
+    def batch_chain_codes(self, subject_codes, topic_codes, steps=CHAIN_LENGTH, live=False):
+        """Advance many chains together, one vectorized step at a time.
+
+        Every step after the first feeds a prediction back into the same
+        subject row, so once a chain repeats its last topic it is at a fixed
+        point. Such chains stop there, which gives the same paths as running
+        all steps and applying remove_trailing_duplicates.
+        Returns a (n, steps) code matrix padded with -1 and the path lengths.
+        """
+        step = self.tree_step if live else self.table_step
+        subject_codes = np.asarray(subject_codes, dtype=np.intp)
+        current = np.asarray(topic_codes, dtype=np.intp).copy()
+        n = len(current)
+
+        paths = np.full((n, steps), -1, dtype=np.intp)
+        lengths = np.zeros(n, dtype=np.intp)
+        active = np.arange(n)
+        for k in range(steps):
+            if not len(active):
+                break
+            predicted = step(subject_codes[active], current[active])
+            if k > 0:
+                moving = predicted != current[active]
+                active, predicted = active[moving], predicted[moving]
+            paths[active, k] = predicted
+            lengths[active] = k + 1
+            current[active] = predicted
+        return paths, lengths
+
+    def encode(self, subjects, topics):
+        """Encode labels, returning codes and a mask of pairs with known labels."""
+        subject_ids = {label: i for i, label in enumerate(self.le_subject.classes_)}
+        topic_ids = {label: i for i, label in enumerate(self.le_current.classes_)}
+        subject_codes = np.array([subject_ids.get(subject, -1) for subject in subjects], dtype=np.intp)
+        topic_codes = np.array([topic_ids.get(topic, -1) for topic in topics], dtype=np.intp)
+        known = (subject_codes >= 0) & (topic_codes >= 0)
+        return subject_codes, topic_codes, known
+
+    def topic_names(self, codes):
+        return self.le_next.classes_[np.asarray(codes, dtype=np.intp)].tolist()
+
+    def verify(self, sample=None, seed=0):
+        """Compare table chains against the live tree for all (or sampled) pairs."""
+        n_subjects = len(self.le_subject.classes_)
+        n_topics = len(self.le_current.classes_)
+        subject_codes, topic_codes = np.divmod(np.arange(n_subjects * n_topics), n_topics)
+        if sample and sample < len(subject_codes):
+            picked = np.random.default_rng(seed).choice(len(subject_codes), size=sample, replace=False)
+            subject_codes, topic_codes = subject_codes[picked], topic_codes[picked]
+
+        expected, expected_lengths = self.batch_chain_codes(subject_codes, topic_codes, live=True)
+        actual, actual_lengths = self.batch_chain_codes(subject_codes, topic_codes)
+        mismatches = []
+        for i in np.flatnonzero((expected != actual).any(axis=1) | (expected_lengths != actual_lengths)):
+            mismatches.append({
+                "subject": self.le_subject.classes_[subject_codes[i]],
+                "current_topic": self.le_current.classes_[topic_codes[i]],
+                "expected": self.topic_names(expected[i, :expected_lengths[i]]),
+                "actual": self.topic_names(actual[i, :actual_lengths[i]]),
+            })
+        return {"checked": len(subject_codes), "mismatches": mismatches}
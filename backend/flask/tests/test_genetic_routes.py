@@ -0,0 +1,34 @@
+import pytest
+from flask import Flask
+from package.genetic_algorithm.routes import MAX_DAYS, genetic_bp
+
+LECTURES = [{"title": "Machine Learning", "mentor": "Prof. Ashok", "mentees": ["Joshua Menezes"], "duration": 60}]
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(genetic_bp, url_prefix="/genetic-algorithm")
+    return app.test_client()
+
+
+def test_job_with_oversized_days_is_rejected(client):
+    response = client.post("/genetic-algorithm/jobs", json={"lectures": LECTURES, "days": 300})
+    assert response.status_code == 400
+    assert "days" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("options", [
+    {"days": MAX_DAYS + 1},
+    {"days": 0},
+    {"start_hour": -5},
+    {"end_hour": 30},
+    {"start_hour": 15, "end_hour": 8},
+    {"step": 20},
+    {"generations": 0},
+    {"population_size": 1},
+    {"islands": 100},
+])
+def test_job_options_out_of_range_are_rejected(client, options):
+    response = client.post("/genetic-algorithm/jobs", json={"lectures": LECTURES, **options})
+    assert response.status_code == 400
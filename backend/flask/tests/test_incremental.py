@@ -0,0 +1,13 @@
+from package.genetic_algorithm.incremental import DEFAULT_DURATION, lectures_from_docs
+
+
+def test_invalid_lecture_documents_are_skipped():
+    lectures, skipped = lectures_from_docs([
+        {"_id": "ok", "title": "Data Science", "mentor": "Prof. Ashok"},
+        {"_id": "negative", "mentor": "Prof. Ashok", "duration": -30},
+        {"_id": "text", "mentor": "Prof. Ashok", "duration": "long"},
+        {"_id": "no-mentor", "duration": 60},
+    ])
+    assert [lecture.lecture_id for lecture in lectures] == ["ok"]
+    assert lectures[0].duration == DEFAULT_DURATION
+    assert [entry["lecture_id"] for entry in skipped] == ["negative", "text", "no-mentor"]
@@ -0,0 +1,21 @@
+import numpy as np
+from package.chatpdf.index_cache import DocumentIndex
+
+CHUNKS = [
+    "Photosynthesis turns light into chemical energy in the chloroplast.",
+    "Chlorophyll absorbs red and blue light for photosynthesis.",
+    "The quarterly sales report shows revenue growth in Europe.",
+]
+VECTORS = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]], dtype=np.float32)
+
+
+def test_hybrid_search_leaves_unrelated_chunks_out_of_the_context():
+    index = DocumentIndex("0" * 32, CHUNKS, VECTORS)
+    context = index.hybrid_search([1.0, 0.0], "How does photosynthesis work?", max_tokens=1000)
+    assert context[0] in CHUNKS[:2]
+    assert CHUNKS[2] not in context
+
+
+def test_hybrid_search_keeps_a_single_chunk_without_term_matches():
+    index = DocumentIndex("0" * 32, CHUNKS[:1], VECTORS[:1])
+    assert index.hybrid_search([0.0, 1.0], "quarterly revenue", max_tokens=1000) == CHUNKS[:1]
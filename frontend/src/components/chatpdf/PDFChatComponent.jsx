@@ -6,6 +6,7 @@ const PDFChatComponent = () => {
   const [question, setQuestion] = useState('');
   const [uploadStatus, setUploadStatus] = useState('');
   const [responseText, setResponseText] = useState('');
+  const [docId, setDocId] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [isLoading2, setIsLoading2] = useState(false);
   const fileInputRef = useRef(null);
@@ -44,6 +45,7 @@ const PDFChatComponent = () => {
           },
         }
       );
+      setDocId(response.data.doc_id);
       setUploadStatus(`${files.length} PDF(s) uploaded successfully`);
     } catch (error) {
       setUploadStatus('Upload failed: ' + error.message);
@@ -60,13 +62,43 @@ const PDFChatComponent = () => {
       return;
     }
 
+    if (!docId) {
+      setResponseText('Please upload PDF file(s) first');
+      return;
+    }
+
     setIsLoading2(true);
+    setResponseText('');
     try {
-      const response = await axios.post(
-        `${FLASK_API}/chatpdf/ask`,
-        { question }
-      );
-      setResponseText(response.data.reply);
+      // Server-sent events: sources first, then the answer token by token
+      const response = await fetch(`${FLASK_API}/chatpdf/ask/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ question, doc_id: docId }),
+      });
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || `HTTP ${response.status}`);
+      }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+          const name = event.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(event.match(/^data: (.*)$/m)?.[1] || '{}');
+          if (name === 'token') {
+            setResponseText((text) => text + data.text);
+          } else if (name === 'error') {
+            throw new Error(data.error);
+          }
+        }
+      }
     } catch (error) {
       setResponseText('Failed to get response: ' + error.message);
     } finally {
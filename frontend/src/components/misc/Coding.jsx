@@ -45,7 +45,16 @@ const CodeEditor = () => {
     setCodeError(null);
 
     try {
-      const resp = await axios.post("https://athenai-backendonly.onrender.com/api/coding/", { "source_code": code, "language": language},{ withCredentials: true });
+      const CODING_API = "https://athenai-backendonly.onrender.com/api/coding";
+      // The backend answers with a token at once; poll it until Judge0 has a result
+      let resp = await axios.post(`${CODING_API}/`, { "source_code": code, "language": language},{ withCredentials: true });
+      while (resp.data.status === 'pending') {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        resp = await axios.get(`${CODING_API}/submissions/${resp.data.token}`, { withCredentials: true });
+      }
+      if (resp.data.error) {
+        throw new Error(resp.data.error);
+      }
       setOutput(resp.data.output);
       setCodeError(resp.data.errors);
       
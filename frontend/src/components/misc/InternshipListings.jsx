@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Search, MapPin, WalletCards,Clock, DollarSign, Calendar, ExternalLink, Loader2, Briefcase, Filter } from 'lucide-react';
 
 const InternshipCard = ({ internship }) => {
@@ -86,32 +86,83 @@ const EmptyState = ({ searchTerm, clearSearch }) => {
 const InternshipListings = () => {
   const FLASK_API = import.meta.env.VITE_FLASK_API;
   const [searchTerm, setSearchTerm] = useState('');
+  const [query, setQuery] = useState('');
+  const [location, setLocation] = useState('');
   const [internships, setInternships] = useState([]);
+  const [locations, setLocations] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [showFilters, setShowFilters] = useState(false);
   
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // True when showing the live first-page feed, which the server cannot search
+  const [usingFeed, setUsingFeed] = useState(false);
+  // Responses to superseded searches are dropped
+  const latestRequest = useRef(0);
+
+  // Search the server as the user types, once they pause
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(searchTerm.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Pages of crawled internships from the indexed store, newest first, filtered on the server
+  const fetchInternships = async (cursor = null) => {
+    const request = ++latestRequest.current;
+    const params = new URLSearchParams({ limit: '30' });
+    if (query) params.set('q', query);
+    if (location) params.set('location', location);
+    if (cursor) params.set('cursor', cursor);
+    let response = await fetch(`${FLASK_API}/internships/search?${params}`);
+    if (!response.ok) {
+      throw new Error(`API request failed with status ${response.status}`);
+    }
+    let data = await response.json();
+    let feed = false;
+    if (!cursor && !query && !location && data.status === "success" && data.data.length === 0) {
+      // Nothing crawled yet: fall back to the live first-page feed
+      response = await fetch(`${FLASK_API}/internships`);
+      if (!response.ok) {
+        throw new Error(`API request failed with status ${response.status}`);
+      }
+      data = await response.json();
+      feed = true;
+    }
+    if (data.status !== "success") {
+      throw new Error("Failed to fetch internships");
+    }
+    if (request !== latestRequest.current) return;
+    // Filter out invalid entries
+    const validInternships = data.data.filter(
+      internship => internship.company !== "N/A" && internship.title !== "N/A"
+    );
+    setInternships(previous => cursor ? [...previous, ...validInternships] : validInternships);
+    setNextCursor(data.next_cursor || null);
+    if (!cursor) setUsingFeed(feed);
+    // Location chips come from what has been seen so far
+    setLocations(previous => [...new Set([...previous, ...validInternships.map(item => item.location)])]);
+  };
+
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      await fetchInternships(nextCursor);
+    } catch (err) {
+      setError(err.message);
+      console.error("Error fetching internships:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   useEffect(() => {
-    const fetchInternships = async () => {
+    // The live feed is a single page, already filtered below
+    if (usingFeed) return;
+    const loadFirstPage = async () => {
       try {
         setLoading(true);
-        const response = await fetch(`${FLASK_API}/internships`);
-        
-        if (!response.ok) {
-          throw new Error(`API request failed with status ${response.status}`);
-        }
-        
-        const data = await response.json();
-        
-        if (data.status === "success") {
-          // Filter out invalid entries
-          const validInternships = data.data.filter(
-            internship => internship.company !== "N/A" && internship.title !== "N/A"
-          );
-          setInternships(validInternships);
-        } else {
-          throw new Error("Failed to fetch internships");
-        }
+        await fetchInternships();
       } catch (err) {
         setError(err.message);
         console.error("Error fetching internships:", err);
@@ -120,19 +171,22 @@ const InternshipListings = () => {
       }
     };
 
-    fetchInternships();
-  }, []);
+    loadFirstPage();
+  }, [query, location]);
 
-  // Filter based on search term
-  const filteredInternships = internships.filter(
+  // Only the live feed fallback is filtered here; search results are already filtered
+  const filteredInternships = usingFeed ? internships.filter(
     internship => 
+      (!location || internship.location === location) && (
       internship.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
       internship.company.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      internship.location.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+      internship.location.toLowerCase().includes(searchTerm.toLowerCase()))
+  ) : internships;
 
-  // Get unique locations for filters
-  const locations = [...new Set(internships.map(item => item.location))];
+  const clearSearch = () => {
+    setSearchTerm('');
+    setLocation('');
+  };
 
   return (
     <div className="bg-gradient-to-br from-indigo-50 via-purple-50 to-blue-50 min-h-screen p-6">
@@ -170,13 +224,15 @@ const InternshipListings = () => {
             <div className="mt-4 pt-4 border-t border-gray-100">
               <h3 className="font-medium text-gray-700 mb-2">Locations</h3>
               <div className="flex flex-wrap gap-2">
-                {locations.map(location => (
+                {locations.map(item => (
                   <button
-                    key={location}
-                    onClick={() => setSearchTerm(location)}
-                    className="px-3 py-1 bg-indigo-100 text-indigo-800 text-sm font-medium rounded-full hover:bg-indigo-200"
+                    key={item}
+                    onClick={() => setLocation(item === location ? '' : item)}
+                    className={`px-3 py-1 text-sm font-medium rounded-full ${item === location
+                      ? 'bg-indigo-600 text-white hover:bg-indigo-700'
+                      : 'bg-indigo-100 text-indigo-800 hover:bg-indigo-200'}`}
                   >
-                    {location}
+                    {item}
                   </button>
                 ))}
               </div>
@@ -211,12 +267,25 @@ const InternshipListings = () => {
             
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
               {filteredInternships.map((internship, index) => (
-                <InternshipCard key={index} internship={internship} />
+                <InternshipCard key={internship.link || index} internship={internship} />
               ))}
             </div>
+
+            {nextCursor && (
+              <div className="mt-10 text-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="inline-flex items-center px-6 py-3 bg-indigo-600 text-white font-medium rounded-lg shadow-md hover:bg-indigo-700 disabled:opacity-60"
+                >
+                  {loadingMore ? <Loader2 size={16} className="mr-2 animate-spin" /> : null}
+                  Load more
+                </button>
+              </div>
+            )}
           </>
         ) : (
-          <EmptyState searchTerm={searchTerm} clearSearch={() => setSearchTerm('')} />
+          <EmptyState searchTerm={[searchTerm, location].filter(Boolean).join(", ")} clearSearch={clearSearch} />
         )}
         
         <div className="mt-16 text-center">